@@ -8,7 +8,11 @@ from app.routes.workout_plans import workout_plans_bp
 from app.routes.admin import admin_bp  # NEW
 import logging
 from flask_cors import CORS
-from flask_session import Session
+from app.sessions import init_session
+from app.conditional import init_validators
+from app.responses import init_responses
+from app.ratelimit import init_ratelimit
+from app.moderation import init_moderation
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 
@@ -34,12 +38,15 @@ def create_app(config_object='app.config.DevelopmentConfig'):
             supports_credentials=True,
         )
 
-        app.config["SESSION_TYPE"] = "filesystem"
         app.config["SESSION_PERMANENT"] = True
         app.config["SESSION_USE_SIGNER"] = True
         app.config["SESSION_COOKIE_HTTPONLY"] = True
-        Session(app)
-        app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+        init_session(app)
+        init_validators(app)
+        init_responses(app)
+        init_ratelimit(app)
+        init_moderation(app)
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
 
         # registering Blueprints
         app.register_blueprint(api_bp, url_prefix='/api')
@@ -0,0 +1,37 @@
+from app.cache import MISSING, TTLCache
+from app.loaders import loader
+
+#---------------------------------------------
+# Cached admin flags
+#
+# Admin flags are cached briefly per user id so dashboard pages don't pay
+# a user_profile round-trip per request. The short TTL bounds how long a
+# revoked admin keeps access on other workers; anything that changes the
+# flag or removes the account must call forget_admin.
+#---------------------------------------------
+
+ADMIN_CACHE_TTL = 30
+
+_admin_cache = TTLCache(maxsize=1_000, ttl=ADMIN_CACHE_TTL)
+
+
+def is_admin(user_id):
+    cached = _admin_cache.get(user_id)
+    if cached is not MISSING:
+        return cached
+
+    profile = loader("user_profile", columns="admin").load(user_id)
+    admin = bool(profile and profile.get("admin"))
+
+    _admin_cache.set(user_id, admin)
+    return admin
+
+
+def prime_admin(user_id, admin):
+    """Seed the cache with a flag we just read (e.g. at login)."""
+    _admin_cache.set(user_id, bool(admin))
+
+
+def forget_admin(user_id):
+    """Drop the cached admin flag - call when it changes or the account is deleted."""
+    _admin_cache.pop(user_id)
@@ -0,0 +1,133 @@
+import numpy as np
+
+#---------------------------------------------
+# Per-exercise training analytics
+#
+# A user's sessions are flattened once into columnar arrays (one entry per
+# set) and every metric is computed with numpy group-bys (bincount /
+# lexsort) rather than per-set python loops.
+#---------------------------------------------
+
+# rep-range buckets: [low, high] inclusive, high=None means open ended
+REP_RANGES = [(1, 5), (6, 12), (13, 20), (21, None)]
+REP_RANGE_LABELS = [f"{lo}-{hi}" if hi else f"{lo}+" for lo, hi in REP_RANGES]
+
+_WEEK = np.timedelta64(7, "D")
+# 1970-01-05 was a monday, so weeks start on mondays like the rollups
+_MONDAY = np.datetime64("1970-01-05", "D")
+
+
+def normalize_name(name):
+    return " ".join(str(name).split()).lower()
+
+
+def flatten(sessions):
+    """
+    Turn workout_session rows ({"created_at", "workout_plan"}) into columnar
+    set data. Returns (names, columns) where names[i] is the display name of
+    exercise code i and columns holds parallel arrays: exercise, day,
+    weight, reps.
+    """
+    keys, display, days, weights, reps = [], {}, [], [], []
+
+    for s in sessions:
+        day = str(s["created_at"])[:10]
+        for ex in (s.get("workout_plan") or {}).get("exercises", []):
+            key = normalize_name(ex.get("name", ""))
+            display.setdefault(key, ex.get("name", key))
+            for st in ex.get("sets", []):
+                keys.append(key)
+                days.append(day)
+                weights.append(st.get("weight", 0))
+                reps.append(st.get("reps", 0))
+
+    uniq, codes = np.unique(np.asarray(keys, dtype=object).astype(str), return_inverse=True)
+    columns = {
+        "exercise": codes.astype(np.int64),
+        "day": np.asarray(days, dtype="datetime64[D]"),
+        "weight": np.asarray(weights, dtype=np.float64),
+        "reps": np.asarray(reps, dtype=np.int64),
+    }
+    return [display[k] for k in uniq], columns
+
+
+def estimated_1rm(weight, reps):
+    """Epley estimate; a single rep is its own 1RM."""
+    return np.where(reps <= 1, weight, weight * (1 + reps / 30.0))
+
+
+def _group_argmax(groups, values, n_groups):
+    """Index of the max value within each group (-1 for empty groups)."""
+    best = np.full(n_groups, -1, dtype=np.int64)
+    if len(values) == 0:
+        return best
+    # sort by group, then value; the last row of each group is its max
+    order = np.lexsort((values, groups))
+    last = np.r_[groups[order][1:] != groups[order][:-1], True]
+    best[groups[order][last]] = order[last]
+    return best
+
+
+def summarize(sessions):
+    """Per-exercise tonnage, estimated 1RM, best sets, weekly trend and rep ranges."""
+    names, col = flatten(sessions)
+    n = len(names)
+    if n == 0:
+        return []
+
+    ex, day, weight, reps = col["exercise"], col["day"], col["weight"], col["reps"]
+    tonnage = weight * reps
+    e1rm = estimated_1rm(weight, reps)
+
+    set_count = np.bincount(ex, minlength=n)
+    rep_total = np.bincount(ex, weights=reps, minlength=n)
+    tonnage_total = np.bincount(ex, weights=tonnage, minlength=n)
+    best_e1rm = _group_argmax(ex, e1rm, n)
+    heaviest = _group_argmax(ex, weight, n)
+
+    # rep-range histogram: (exercise, range) flattened into one bincount
+    edges = np.array([lo for lo, _ in REP_RANGES[1:]])
+    rng = np.searchsorted(edges, reps, side="right")
+    n_ranges = len(REP_RANGES)
+    rep_hist = np.bincount(ex * n_ranges + rng, minlength=n * n_ranges).reshape(n, n_ranges)
+
+    # weekly trend: (exercise, week) keys -> tonnage sum and best e1rm
+    week = ((day - _MONDAY) // _WEEK).astype(np.int64)
+    week_keys, week_idx = np.unique(np.stack([ex, week], axis=1), axis=0, return_inverse=True)
+    week_idx = week_idx.reshape(-1)
+    week_tonnage = np.bincount(week_idx, weights=tonnage, minlength=len(week_keys))
+    week_e1rm = np.full(len(week_keys), 0.0)
+    np.maximum.at(week_e1rm, week_idx, e1rm)
+    week_start = _MONDAY + week_keys[:, 1] * _WEEK
+
+    def set_info(i):
+        return {
+            "weight": float(weight[i]),
+            "reps": int(reps[i]),
+            "date": str(day[i]),
+            "estimated_1rm": round(float(e1rm[i]), 2),
+        }
+
+    # week_keys is sorted by exercise, so each exercise owns one slice
+    bounds = np.searchsorted(week_keys[:, 0], np.arange(n + 1))
+
+    results = []
+    for code, name in enumerate(names):
+        wk = slice(bounds[code], bounds[code + 1])
+        results.append({
+            "exercise": name,
+            "sets": int(set_count[code]),
+            "reps": int(rep_total[code]),
+            "tonnage": round(float(tonnage_total[code]), 2),
+            "estimated_1rm": round(float(e1rm[best_e1rm[code]]), 2),
+            "best_set": set_info(best_e1rm[code]),
+            "heaviest_set": set_info(heaviest[code]),
+            "rep_ranges": dict(zip(REP_RANGE_LABELS, rep_hist[code].tolist())),
+            "weekly": [
+                {"week": str(w), "tonnage": round(float(t), 2), "estimated_1rm": round(float(e), 2)}
+                for w, t, e in zip(week_start[wk], week_tonnage[wk], week_e1rm[wk])
+            ],
+        })
+
+    results.sort(key=lambda r: r["tonnage"], reverse=True)
+    return results
@@ -0,0 +1,197 @@
+import hashlib
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import Response, make_response, request, session
+from app.cache import MISSING, TTLCache
+from app.responses import ETAG_SUFFIXES, choose_encoding
+
+#---------------------------------------------
+# Conditional GET (ETag / Last-Modified)
+#
+# Read endpoints are tagged with the "scopes" their response depends on
+# (e.g. "posts", "post:<id>", "plans:<user_id>"). Each scope has a version
+# token that write paths replace through touch(). A response's ETag is a
+# hash of its scopes' versions, the viewer and the url, so a matching
+# If-None-Match gets a 304 after one version lookup - no database
+# round-trip and no serializing or hashing of the payload. Last-Modified
+# is derived from the newest version's timestamp once that second is over.
+#
+# Versions live in the same kind of store as sessions: in-process for a
+# single worker, redis when several workers must agree. A lost version
+# (restart, eviction) only means one extra full response.
+#---------------------------------------------
+
+# versions expire eventually so the store stays bounded
+VERSION_TTL = 7 * 24 * 3600
+
+
+def new_version():
+    """'<ms since epoch, hex>.<random>' - the timestamp doubles as Last-Modified."""
+    return f"{time.time_ns() // 1_000_000:x}.{secrets.token_hex(4)}"
+
+
+class MemoryVersions:
+    def __init__(self, maxsize=100_000):
+        self._versions = TTLCache(maxsize=maxsize, ttl=VERSION_TTL)
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """Current versions for keys, creating any that don't exist yet."""
+        with self._lock:
+            out = []
+            for key in keys:
+                version = self._versions.get(key)
+                if version is MISSING:
+                    version = new_version()
+                    self._versions.set(key, version)
+                out.append(version)
+            return out
+
+    def touch(self, keys):
+        with self._lock:
+            for key in keys:
+                self._versions.set(key, new_version())
+
+
+class RedisVersions:
+    def __init__(self, client, prefix="version:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("VALIDATOR_BACKEND='redis' requires the redis package")
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get_many(self, keys):
+        names = [self.prefix + k for k in keys]
+        versions = self.client.mget(names)
+        missing = [i for i, v in enumerate(versions) if v is None]
+        if missing:
+            # nx: another worker may have created the version meanwhile
+            pipe = self.client.pipeline()
+            for i in missing:
+                pipe.set(names[i], new_version(), nx=True, ex=VERSION_TTL)
+            pipe.execute()
+            for i, v in zip(missing, self.client.mget([names[i] for i in missing])):
+                versions[i] = v
+        return [v.decode() if isinstance(v, bytes) else v for v in versions]
+
+    def touch(self, keys):
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.set(self.prefix + key, new_version(), ex=VERSION_TTL)
+        pipe.execute()
+
+
+_store = MemoryVersions()
+
+
+def init_validators(app):
+    """Pick the version store; defaults to the session backend."""
+    global _store
+    backend = app.config.get("VALIDATOR_BACKEND") or app.config.get("SESSION_BACKEND", "memory")
+
+    if backend == "memory":
+        _store = MemoryVersions()
+    elif backend == "redis":
+        url = app.config.get("VALIDATOR_REDIS_URL") or app.config["SESSION_REDIS_URL"]
+        _store = RedisVersions.from_url(url)
+    else:
+        raise ValueError(f"Unknown VALIDATOR_BACKEND: {backend}")
+
+
+def touch(*scopes):
+    """Invalidate every cached response that depends on these scopes."""
+    scopes = [s for s in scopes if s]
+    if scopes:
+        _store.touch(scopes)
+
+
+def user_scopes(user_id):
+    """Everything deleting an account cascades into."""
+    return ["posts", "names", f"user:{user_id}", f"plans:{user_id}", f"sessions:{user_id}"]
+
+
+def validators(scopes):
+    """
+    (etag, last_modified) for a request depending on scopes. last_modified
+    is None while the newest version is under a second old: HTTP dates
+    have whole-second resolution, so a later write in the same second
+    would carry the same date and If-Modified-Since couldn't tell them apart.
+    """
+    versions = _store.get_many(scopes)
+    user = session.get("user") or {}
+
+    raw = "|".join([*versions, str(user.get("id", "")), request.full_path])
+    etag = hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+    newest = max(int(v.split(".", 1)[0], 16) for v in versions)
+    if time.time_ns() // 1_000_000 - newest < 1000:
+        return etag, None
+    return etag, datetime.fromtimestamp(newest // 1000, tz=timezone.utc)
+
+
+def _not_modified(etag, last_modified):
+    """The validator to echo in a 304, or None if the client's copy is stale."""
+    if request.if_none_match:
+        # the client may hold the tag of the compressed representation this
+        # request would get (small bodies go out uncompressed, unsuffixed)
+        suffixes = [""]
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is not None:
+            suffixes.append(ETAG_SUFFIXES[encoding])
+        for suffix in suffixes:
+            if request.if_none_match.contains(etag + suffix):
+                return etag + suffix
+        return None
+    # If-Modified-Since is only consulted without If-None-Match (RFC 9110),
+    # and only once the version's second has passed (see validators)
+    since = request.if_modified_since
+    if since is None or last_modified is None:
+        return None
+    return etag if last_modified <= since else None
+
+
+def conditional(scopes):
+    """
+    Decorate a GET view with ETag / Last-Modified validation. `scopes` is
+    called with the view's arguments and returns the scope names the
+    response depends on (or None to skip validation, e.g. logged out).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            keys = scopes(*args, **kwargs)
+            if not keys:
+                return view(*args, **kwargs)
+
+            etag, last_modified = validators(keys)
+            matched = _not_modified(etag, last_modified)
+            if matched:
+                response = Response(status=304)
+                etag = matched
+                # a 304 carries the same Vary as the 200 it stands in for
+                response.vary.add("Accept-Encoding")
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # always revalidate; responses depend on the logged-in user
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.vary.add("Cookie")
+            return response
+        return wrapper
+    return decorator
@@ -15,6 +15,67 @@ class Config:
     SUPABASE_URL = os.environ.get('SUPABASE_URL', '')
     SUPABASE_KEY = os.environ.get('SUPABASE_KEY', '')
 
+    # request threads per gunicorn worker (the same variable gunicorn.conf.py reads)
+    GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', 32))
+
+    # threads per worker used to run a handler's independent queries concurrently
+    FANOUT_THREADS = int(os.environ.get('FANOUT_THREADS', 16))
+
+    # supabase http connection pool (see app/supabase_client.py)
+    # every request thread and fanout thread may hold a connection at once,
+    # plus a few for the background timeline / moderation / records workers
+    SUPABASE_POOL_SIZE = int(os.environ.get('SUPABASE_POOL_SIZE', GUNICORN_THREADS + FANOUT_THREADS + 4))
+    SUPABASE_POOL_KEEPALIVE = int(os.environ.get('SUPABASE_POOL_KEEPALIVE', 10))
+    SUPABASE_KEEPALIVE_EXPIRY = float(os.environ.get('SUPABASE_KEEPALIVE_EXPIRY', 30))
+    SUPABASE_CONNECT_TIMEOUT = float(os.environ.get('SUPABASE_CONNECT_TIMEOUT', 5))
+    SUPABASE_READ_TIMEOUT = float(os.environ.get('SUPABASE_READ_TIMEOUT', 15))
+    SUPABASE_POOL_TIMEOUT = float(os.environ.get('SUPABASE_POOL_TIMEOUT', 5))
+    # read timeout for known-slow reads: analytics, exports, rebuilds (see slow_calls)
+    SUPABASE_SLOW_READ_TIMEOUT = float(os.environ.get('SUPABASE_SLOW_READ_TIMEOUT', 60))
+
+    # POST /sessions/import: rows per insert and rows per request
+    SESSION_IMPORT_BATCH_SIZE = int(os.environ.get('SESSION_IMPORT_BATCH_SIZE', 500))
+    SESSION_IMPORT_MAX_ROWS = int(os.environ.get('SESSION_IMPORT_MAX_ROWS', 20000))
+
+    # server-side sessions (see app/sessions.py)
+    # 'memory' keeps sessions in-process - only valid with a single worker process
+    # 'redis' shares them across gunicorn workers / hosts
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'memory')
+    SESSION_REDIS_URL = os.environ.get('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+
+    # response compression (see app/responses.py)
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+
+    # ETag version store (see app/conditional.py); empty -> same as sessions
+    VALIDATOR_BACKEND = os.environ.get('VALIDATOR_BACKEND', '')
+    VALIDATOR_REDIS_URL = os.environ.get('VALIDATOR_REDIS_URL', '')
+
+    # rate limits (see app/ratelimit.py): token buckets per blueprint keyed by
+    # client IP and user id, as "N/second|minute|hour"; "0" disables one.
+    # inflight caps concurrent requests per worker before shedding with 429.
+    # Store defaults to the session backend, like the ETag versions.
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', '1') == '1'
+    RATELIMIT_BACKEND = os.environ.get('RATELIMIT_BACKEND', '')
+    RATELIMIT_REDIS_URL = os.environ.get('RATELIMIT_REDIS_URL', '')
+    RATELIMIT_BUDGETS = {
+        "auth": {
+            "ip": os.environ.get('RATELIMIT_AUTH_IP', '10/minute'),
+            "inflight": int(os.environ.get('RATELIMIT_AUTH_INFLIGHT', 8)),
+        },
+        "posts": {
+            "ip": os.environ.get('RATELIMIT_POSTS_IP', '120/minute'),
+            "user": os.environ.get('RATELIMIT_POSTS_USER', '30/minute'),
+            "inflight": int(os.environ.get('RATELIMIT_POSTS_INFLIGHT', 16)),
+        },
+        "sessions": {
+            "ip": os.environ.get('RATELIMIT_SESSIONS_IP', '60/minute'),
+            "user": os.environ.get('RATELIMIT_SESSIONS_USER', '20/minute'),
+            "inflight": int(os.environ.get('RATELIMIT_SESSIONS_INFLIGHT', 8)),
+        },
+    }
+
     
 # subclasses
 class DevelopmentConfig(Config):
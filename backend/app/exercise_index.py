@@ -0,0 +1,137 @@
+import sys
+from app.analytics import normalize_name
+from app.cache import MISSING, TTLCache
+from app.pagination import apply_keyset, page
+from app.supabase_client import supabase
+
+#---------------------------------------------
+# Per-exercise history index
+#
+# exercise_history holds one row per (session, exercise) keyed for range
+# reads on (user_id, exercise_id, performed_at, session_id), so "every
+# set of squat I've done" is one indexed page instead of a scan over
+# every workout_plan. Exercise names are normalized and interned in
+# exercise_names; "Bench Press" and "bench  press" share one id.
+#
+# Kept current by the session create / import / update / delete routes.
+#---------------------------------------------
+
+# name -> id never changes once assigned, so entries only age out for size
+_name_ids = TTLCache(maxsize=50_000, ttl=24 * 3600)
+
+
+def exercise_key(name):
+    return sys.intern(normalize_name(name))
+
+
+def _lookup(names):
+    found = {}
+    for i in range(0, len(names), 200):
+        res = supabase.table("exercise_names").select("id, name").in_("name", names[i:i + 200]).execute()
+        found.update({row["name"]: row["id"] for row in res.data or []})
+    return found
+
+
+def name_ids(names, create=True):
+    """Map normalized names to interned ids, creating missing ones if asked."""
+    ids, missing = {}, []
+    for name in dict.fromkeys(names):
+        cached = _name_ids.get(name)
+        if cached is MISSING:
+            missing.append(name)
+        else:
+            ids[name] = cached
+
+    if missing:
+        found = _lookup(missing)
+        new = [n for n in missing if n not in found]
+        if new and create:
+            # a concurrent writer may intern the same name, so never fail on it
+            supabase.table("exercise_names").upsert(
+                [{"name": n} for n in new], on_conflict="name", ignore_duplicates=True
+            ).execute()
+            found.update(_lookup(new))
+        for name, id_ in found.items():
+            _name_ids.set(name, id_)
+        ids.update(found)
+    return ids
+
+
+def session_rows(user_id, session_id, performed_at, workout_plan):
+    """Index rows for one session, one per exercise (repeated exercises merged)."""
+    by_name = {}
+    for ex in (workout_plan or {}).get("exercises", []):
+        key = exercise_key(ex.get("name", ""))
+        entry = by_name.setdefault(key, {"display_name": ex.get("name", key), "sets": []})
+        entry["sets"].extend(
+            {"weight": st.get("weight", 0), "reps": st.get("reps", 0)} for st in ex.get("sets", [])
+        )
+
+    rows = []
+    for key, entry in by_name.items():
+        sets = entry["sets"]
+        rows.append({
+            "user_id": user_id,
+            "exercise": key,
+            "session_id": session_id,
+            "performed_at": performed_at,
+            "display_name": entry["display_name"],
+            "sets": sets,
+            "set_count": len(sets),
+            "volume": float(sum(s["weight"] * s["reps"] for s in sets)),
+            "top_weight": float(max((s["weight"] for s in sets), default=0)),
+        })
+    return rows
+
+
+def index_sessions(user_id, sessions):
+    """
+    Add index rows for inserted workout_session rows
+    ({"id", "created_at", "workout_plan"}) in one round-trip per chunk.
+    """
+    rows = [
+        r for s in sessions
+        for r in session_rows(user_id, s["id"], s["created_at"], s.get("workout_plan"))
+    ]
+    if not rows:
+        return
+
+    ids = name_ids([r["exercise"] for r in rows])
+    for r in rows:
+        r["exercise_id"] = ids[r.pop("exercise")]
+
+    for i in range(0, len(rows), 500):
+        supabase.table("exercise_history").upsert(
+            rows[i:i + 500], on_conflict="session_id,exercise_id"
+        ).execute()
+
+
+def reindex_session(user_id, session_id, performed_at, workout_plan):
+    """Replace a session's rows after its workout_plan changed."""
+    remove_session(session_id)
+    index_sessions(user_id, [{"id": session_id, "created_at": performed_at, "workout_plan": workout_plan}])
+
+
+def remove_session(session_id):
+    supabase.table("exercise_history").delete().eq("session_id", session_id).execute()
+
+
+def history(user_id, name, limit, cursor=None, desc=False):
+    """
+    One page of a user's history for an exercise, oldest first unless desc.
+    Returns (rows, next_cursor). Raises InvalidCursor on a bad cursor.
+    """
+    exercise_id = name_ids([exercise_key(name)], create=False).get(exercise_key(name))
+    if exercise_id is None:
+        return [], None
+
+    query = (
+        supabase.table("exercise_history")
+        .select("session_id, performed_at, display_name, sets, set_count, volume, top_weight")
+        .eq("user_id", user_id)
+        .eq("exercise_id", exercise_id)
+    )
+    query = apply_keyset(query, cursor, desc=desc, created_col="performed_at", id_col="session_id")
+
+    res = query.limit(limit + 1).execute()
+    return page(res.data, limit, created_col="performed_at", id_col="session_id")
@@ -0,0 +1,33 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.config import Config
+
+#---------------------------------------------
+# Concurrent fan-out for independent queries
+#
+# Handlers that need several supabase calls which don't depend on each
+# other run them through concurrently() so the request waits for the
+# slowest call instead of the sum of all of them. Calls share the pooled,
+# thread-safe client from app.supabase_client; each one runs in a copy of
+# the caller's context so flask's g / session stay available.
+#---------------------------------------------
+
+_PREFIX = "supabase-fanout"
+_executor = ThreadPoolExecutor(max_workers=Config.FANOUT_THREADS, thread_name_prefix=_PREFIX)
+
+
+def concurrently(*calls):
+    """
+    Run zero-argument callables at the same time and return their results
+    in order. The first exception raised by any call is re-raised.
+    """
+    # nested fan-out from inside a fan-out thread runs inline, so pool
+    # threads never block waiting on work queued behind them
+    if len(calls) <= 1 or threading.current_thread().name.startswith(_PREFIX):
+        return [call() for call in calls]
+
+    futures = [
+        _executor.submit(contextvars.copy_context().run, call) for call in calls
+    ]
+    return [f.result() for f in futures]
@@ -0,0 +1,28 @@
+from app.cache import MISSING, TTLCache
+
+#---------------------------------------------
+# Cached admin listing totals
+#
+# Admin listings report an exact total per table and filter set. The
+# count query is cached for COUNT_CACHE_TTL; anything that adds or
+# removes users, posts or plans calls forget_counts so the totals in
+# this worker don't lag behind the rows.
+#---------------------------------------------
+
+COUNT_CACHE_TTL = 60
+
+_counts = TTLCache(maxsize=1_000, ttl=COUNT_CACHE_TTL)
+
+
+def cached_count(table, key, load):
+    """The cached total for (table, key), computed with load() on a miss."""
+    total = _counts.get((table, key))
+    if total is MISSING:
+        total = load()
+        _counts.set((table, key), total)
+    return total
+
+
+def forget_counts():
+    """Drop cached totals - call after rows are added or removed."""
+    _counts.clear()
@@ -0,0 +1,89 @@
+from flask import g, has_request_context
+from app.supabase_client import supabase
+
+#---------------------------------------------
+# Request-scoped batching loaders (DataLoader pattern)
+#
+# Point lookups go through loader(table, key, columns) instead of
+# supabase.table(...).eq(key, value).single(). Keys queued with prime()
+# are fetched together by the next load() in one in_() query, and every
+# row is memoized for the rest of the request, so per-item lookups are a
+# single round-trip instead of N. Call forget() after writing a row that
+# was loaded earlier in the same request.
+#---------------------------------------------
+
+# max values per in_() filter, keeps the request url a sane length
+BATCH_SIZE = 200
+
+
+class Loader:
+    def __init__(self, table, key="id", columns="*"):
+        self.table = table
+        self.key = key
+        self.columns = columns
+        if columns != "*" and key not in [c.strip() for c in columns.split(",")]:
+            self.columns = f"{key}, {columns}"
+
+        self._rows = {}
+        self._pending = set()
+
+    def prime(self, *keys):
+        """Queue keys to be fetched with the next load / load_many."""
+        for k in keys:
+            if k is not None and str(k) not in self._rows:
+                self._pending.add(str(k))
+
+    def load(self, key):
+        """Return the row for key, or None if there is none."""
+        return self.load_many([key])[0]
+
+    def load_many(self, keys):
+        """Return rows (or None) for keys, in order, in at most one batch."""
+        self.prime(*keys)
+        self.flush()
+        return [self._rows.get(str(k)) for k in keys]
+
+    def flush(self):
+        pending = sorted(self._pending)
+        self._pending.clear()
+
+        for i in range(0, len(pending), BATCH_SIZE):
+            chunk = pending[i:i + BATCH_SIZE]
+            res = supabase.table(self.table).select(self.columns).in_(self.key, chunk).execute()
+
+            for k in chunk:
+                self._rows[k] = None
+            for row in res.data or []:
+                self._rows[str(row[self.key])] = row
+
+    def forget(self, key=None):
+        if key is None:
+            self._rows.clear()
+        else:
+            self._rows.pop(str(key), None)
+
+
+def loader(table, key="id", columns="*"):
+    """
+    Loader for (table, key, columns), shared by everything in the current
+    request. Outside a request a fresh, unshared loader is returned.
+    """
+    if not has_request_context():
+        return Loader(table, key, columns)
+
+    loaders = g.setdefault("loaders", {})
+    ident = (table, key, columns)
+    if ident not in loaders:
+        loaders[ident] = Loader(table, key, columns)
+    return loaders[ident]
+
+
+def forget(table, key=None):
+    """Drop memoized rows of `table` (all of them if key is None) after a write."""
+    if not has_request_context():
+        return
+    for (name, _, _), ldr in g.get("loaders", {}).items():
+        if name == table:
+            # rows memoized under a different key column can't be matched
+            # by value, so clear those loaders entirely
+            ldr.forget(key if ldr.key == "id" else None)
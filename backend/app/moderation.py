@@ -0,0 +1,257 @@
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from postgrest.types import ReturnMethod
+from app.supabase_client import supabase
+from app.fanout import concurrently
+
+#---------------------------------------------
+# Bulk moderation
+#
+# Bulk deletes take a list of ids and remove them in chunked in_()
+# statements, reporting an outcome per id ("deleted", "not_found",
+# "invalid", "error"). Posts and plans are deleted inside the request.
+#
+# Deleting accounts cascades into posts, plans, sessions, likes, follow
+# edges and timelines, which is far too much work for one request. It
+# runs as a background job instead: the request records the job in
+# moderation_jobs and returns at once, and a single worker thread per
+# process works through queued purges chunk by chunk, writing per-id
+# outcomes and a heartbeat back to the job row as it goes.
+#
+# A job whose heartbeat goes quiet for STALE_AFTER was lost with its
+# worker. Workers look for those at startup, and GET /admin/jobs/<id>
+# checks the job it reads; the first to claim a stale job resumes it
+# from the ids still queued. Purging is idempotent, so redoing a chunk
+# that was cut short is harmless.
+#---------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# ids per in_() filter; keeps the query string well under url limits
+CHUNK_SIZE = 200
+
+# ids a single bulk request may act on (explicit or matched by a filter)
+MAX_BULK_IDS = 5000
+
+# seconds without a heartbeat before a queued / running job is resumed
+STALE_AFTER = 600
+
+# one purge at a time per worker so cascades don't crowd out live traffic
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="moderation")
+
+# called with {id: username} after each purged chunk; see on_purged()
+_listeners = []
+
+
+def chunks(items, size=CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def parse_ids(raw, kind):
+    """
+    Split requested ids into (valid, outcomes) where outcomes maps each
+    malformed id to "invalid". kind is "uuid" or "int"; order is kept and
+    duplicates dropped.
+    """
+    valid, outcomes = [], {}
+    for value in dict.fromkeys(str(v) for v in raw):
+        try:
+            valid.append(str(uuid.UUID(value)) if kind == "uuid" else int(value))
+        except ValueError:
+            outcomes[value] = "invalid"
+    return valid, outcomes
+
+
+def delete_in(table, ids):
+    """
+    Delete rows by id in chunked in_() statements (run concurrently).
+    Returns (deleted rows, {id: outcome}).
+    """
+    def run(chunk):
+        try:
+            res = supabase.table(table).delete().in_("id", chunk).execute()
+            return chunk, res.data or [], None
+        except Exception as e:
+            logger.exception("bulk delete from %s failed", table)
+            return chunk, [], e
+
+    deleted, outcomes = [], {}
+    for chunk, rows, error in concurrently(*[lambda c=c: run(c) for c in chunks(ids)]):
+        gone = {str(r["id"]) for r in rows}
+        deleted.extend(rows)
+        for id_ in chunk:
+            key = str(id_)
+            outcomes[key] = "error" if error else ("deleted" if key in gone else "not_found")
+    return deleted, outcomes
+
+
+def existing_ids(table, ids, columns="id"):
+    """Rows among ids that still exist, looked up one chunk at a time."""
+    rows = []
+    for chunk in chunks(ids):
+        rows.extend(supabase.table(table).select(columns).in_("id", chunk).execute().data or [])
+    return rows
+
+
+# ----------------------------
+# ACCOUNT PURGE JOBS
+# ----------------------------
+
+def on_purged(fn):
+    """
+    Register fn({id: username}) to run after each purged chunk, e.g. to
+    drop cached state about the removed accounts. Usable as a decorator.
+    """
+    _listeners.append(fn)
+    return fn
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def start_user_purge(user_ids, requested_by):
+    """Record a purge job for user_ids and queue it; returns the job row."""
+    job = supabase.table("moderation_jobs").insert({
+        "kind": "purge_users",
+        "requested_by": requested_by,
+        "results": {id_: "queued" for id_ in user_ids},
+    }).execute().data[0]
+
+    _executor.submit(_start, job)
+    return job
+
+
+def get_job(job_id):
+    """The job row; a stale one is claimed and resumed first."""
+    def read():
+        res = supabase.table("moderation_jobs").select("*").eq("id", job_id).limit(1).execute()
+        return res.data[0] if res.data else None
+
+    job = read()
+    if job and _is_stale(job):
+        _resume(job)
+        job = read()
+    return job
+
+
+def init_moderation(app):
+    """Resume purges that a previous worker left unfinished."""
+    _executor.submit(resume_stale)
+
+
+def resume_stale():
+    try:
+        cutoff = (_now() - timedelta(seconds=STALE_AFTER)).isoformat()
+        res = (
+            supabase.table("moderation_jobs")
+            .select("*")
+            .in_("status", ["queued", "running"])
+            .lt("heartbeat_at", cutoff)
+            .execute()
+        )
+        for job in res.data or []:
+            _resume(job)
+    except Exception:
+        logger.exception("could not resume stale moderation jobs")
+
+
+def _is_stale(job):
+    if job["status"] not in ("queued", "running"):
+        return False
+    beat = datetime.fromisoformat(job["heartbeat_at"])
+    return _now() - beat > timedelta(seconds=STALE_AFTER)
+
+
+def _claim(job_id, status, heartbeat_at):
+    """
+    Mark a job running under this worker. Conditional on the status and
+    heartbeat we read, so exactly one worker wins a given job.
+    """
+    res = (
+        supabase.table("moderation_jobs")
+        .update({"status": "running", "heartbeat_at": _now().isoformat()})
+        .eq("id", job_id)
+        .eq("status", status)
+        .eq("heartbeat_at", heartbeat_at)
+        .execute()
+    )
+    return bool(res.data)
+
+
+def _start(job):
+    if _claim(job["id"], "queued", job["heartbeat_at"]):
+        _run_purge(job["id"], job["results"])
+
+
+def _resume(job):
+    if _claim(job["id"], job["status"], job["heartbeat_at"]):
+        logger.info("resuming moderation job %s", job["id"])
+        _executor.submit(_run_purge, job["id"], job["results"])
+
+
+def _update_job(job_id, **fields):
+    supabase.table("moderation_jobs").update({**fields, "heartbeat_at": _now().isoformat()}).eq("id", job_id).execute()
+
+
+def _run_purge(job_id, results):
+    results = dict(results)
+    user_ids = [id_ for id_, outcome in results.items() if outcome == "queued"]
+    try:
+        for chunk in chunks(user_ids):
+            try:
+                purged = purge_users(chunk)
+                for listener in _listeners:
+                    listener(purged)
+                results.update({id_: "deleted" if id_ in purged else "not_found" for id_ in chunk})
+            except Exception:
+                logger.exception("moderation job %s: purge chunk failed", job_id)
+                results.update({id_: "error" for id_ in chunk})
+            # progress is visible to GET /admin/jobs/<id> after every chunk
+            _update_job(job_id, results=results)
+
+        _update_job(job_id, status="done", finished_at=_now().isoformat())
+    except Exception as e:
+        logger.exception("moderation job %s failed", job_id)
+        try:
+            _update_job(job_id, status="failed", error=str(e), results=results,
+                        finished_at=_now().isoformat())
+        except Exception:
+            logger.exception("moderation job %s: could not record failure", job_id)
+
+
+def purge_users(user_ids):
+    """
+    Delete a chunk of accounts and everything hanging off them.
+    Returns {id: username} for the user_profile rows deleted.
+    """
+    def drop(table, column):
+        # no need to ship the deleted rows back
+        return supabase.table(table).delete(returning=ReturnMethod.minimal).in_(column, user_ids).execute
+
+    # edges first, so counters and other users' timelines are fixed up
+    # before the rows they point at disappear
+    supabase.rpc("purge_post_likes", {"p_user_ids": user_ids}).execute()
+    concurrently(
+        drop("Followers", "user_id"),
+        drop("Followers", "followed_user_id"),
+        drop("user_likes", "user_id"),
+        drop("user_likes", "liked_user_id"),
+        drop("timeline", "author_id"),
+        drop("timeline", "user_id"),
+    )
+
+    # owned content; comments / likes on their posts cascade with the posts,
+    # exercise_history with the sessions
+    concurrently(
+        drop("Posts", "user_id"),
+        drop("workout_plans", "user_id"),
+        drop("workout_session", "user_id"),
+    )
+
+    # rollups and personal records cascade with the profile
+    res = supabase.table("user_profile").delete().in_("id", user_ids).execute()
+    return {row["id"]: row.get("username") for row in res.data or []}
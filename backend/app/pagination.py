@@ -0,0 +1,108 @@
+import base64
+import json
+
+#---------------------------------------------
+# Keyset (cursor) pagination helpers
+#---------------------------------------------
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 50
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at, row_id, scope=None):
+    """
+    Encode the (created_at, id) position of the last row on a page into an
+    opaque, url-safe token. A scope (e.g. the listing's sort and order) is
+    carried along so the token can't be replayed against another ordering.
+    """
+    position = [created_at, row_id] if scope is None else [created_at, row_id, scope]
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, scope=None):
+    """
+    Decode a token produced by encode_cursor back into (created_at, id).
+    created_at may be None for a row whose (nullable) sort key is NULL.
+    Raises InvalidCursor if the token was tampered with or is malformed,
+    or was issued for a different scope.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id, *rest = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+    if rest != ([] if scope is None else [scope]):
+        raise InvalidCursor("Cursor does not match this sort / order")
+
+    if not isinstance(created_at, (str, type(None))) or not isinstance(row_id, (str, int)):
+        raise InvalidCursor("Invalid cursor")
+    return created_at, row_id
+
+
+def quote(value):
+    """Quote a value as a literal inside a postgrest or=() / and=() filter."""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Clamp a ?limit= query value to [1, maximum]."""
+    try:
+        limit = int(value) if value is not None else default
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
+
+
+def apply_keyset(query, cursor, desc=True, created_col="created_at", id_col="id", nullable=False, scope=None):
+    """
+    Order a postgrest query by (created_at, id) and, if a cursor is given,
+    only return rows strictly after it. Uses the composite index instead of
+    OFFSET so every page costs the same.
+
+    With nullable=True the sort column may hold NULLs. They keep postgres'
+    default place (last ascending, first descending, so the index still
+    serves both directions) and the cursor continues into / out of them.
+
+    scope must match the one the cursor was encoded with (see encode_cursor).
+    """
+    query = query.order(created_col, desc=desc).order(id_col, desc=desc)
+
+    if cursor:
+        created_at, row_id = decode_cursor(cursor, scope)
+        op = "lt" if desc else "gt"
+        after_id = f"{id_col}.{op}.{quote(row_id)}"
+
+        if created_at is None:
+            if not nullable:
+                raise InvalidCursor("Invalid cursor")
+            clauses = [f"and({created_col}.is.null,{after_id})"]
+            if desc:
+                # descending, the NULL rows come first - every value follows
+                clauses.append(f"{created_col}.not.is.null")
+        else:
+            value = quote(created_at)
+            clauses = [f"{created_col}.{op}.{value}", f"and({created_col}.eq.{value},{after_id})"]
+            if nullable and not desc:
+                clauses.append(f"{created_col}.is.null")
+        query = query.or_(",".join(clauses))
+    return query
+
+
+def page(rows, limit, created_col="created_at", id_col="id"):
+    """
+    Split a result fetched with limit + 1 rows into (rows, next_cursor).
+    next_cursor is None on the last page.
+    """
+    rows = rows or []
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last[created_col], last[id_col])
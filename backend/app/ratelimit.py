@@ -0,0 +1,206 @@
+import logging
+import math
+import threading
+import time
+from functools import wraps
+
+from flask import jsonify, request, session
+from app.cache import MISSING, TTLCache
+
+#---------------------------------------------
+# Rate limiting and load shedding for write endpoints
+#
+# Each blueprint has a budget (RATELIMIT_BUDGETS in config): token
+# buckets keyed by client IP and, when logged in, by user id, written as
+# "N/second|minute|hour" - a burst of N refilled evenly over the period.
+# A request takes one token from every bucket it maps to, or none if
+# any of them is empty, in which case it gets a 429 with Retry-After.
+#
+# Budgets may also cap requests in flight per worker ("inflight"). Once
+# the cap is reached further requests are turned away with a 429 at
+# once instead of queueing for a thread behind a slow upstream call
+# (Supabase Auth, mostly).
+#
+# Buckets live in the same kind of store as sessions: in-process for a
+# single worker, redis when several workers must share them (one script
+# call per request). If the store is unreachable requests are let
+# through - the limiter never takes writes down with it.
+#---------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+# seconds to wait after being shed for concurrency rather than rate
+SHED_RETRY_AFTER = 1
+
+
+def parse_rate(spec):
+    """'30/minute' -> (capacity 30, refill 0.5 tokens/s); None for '' / '0'."""
+    if not spec or spec.strip() in ("0", "off"):
+        return None
+    count, _, period = spec.partition("/")
+    if not count.strip().isdigit() or int(count) <= 0 or period.strip() not in PERIODS:
+        raise ValueError(f"Bad rate limit '{spec}' - expected N/second, N/minute or N/hour")
+    return int(count), int(count) / PERIODS[period.strip()]
+
+
+class MemoryBuckets:
+    def __init__(self, maxsize=100_000):
+        # an idle bucket refills completely, so it can simply expire
+        self._buckets = TTLCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def take(self, checks):
+        """
+        checks: [(key, capacity, rate)]. Take a token from each bucket if
+        all have one; returns 0, or the seconds until they all would.
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels, wait = [], 0.0
+            for key, capacity, rate in checks:
+                state = self._buckets.get(key)
+                tokens, at = (capacity, now) if state is MISSING else state
+                tokens = min(capacity, tokens + (now - at) * rate)
+                if tokens < 1:
+                    wait = max(wait, (1 - tokens) / rate)
+                levels.append(tokens)
+            if wait:
+                return wait
+            for (key, capacity, rate), tokens in zip(checks, levels):
+                self._buckets.set(key, (tokens - 1, now), ttl=capacity / rate)
+            return 0
+
+
+# same all-or-nothing take as MemoryBuckets, atomically in redis.
+# KEYS: bucket keys; ARGV: now, then capacity and rate for each key.
+# Returns the wait as a string - lua numbers come back as integers.
+TAKE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local state = redis.call('HMGET', key, 't', 'at')
+    local tokens = tonumber(state[1]) or capacity
+    local at = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - at) * rate)
+    if tokens < 1 then
+        wait = math.max(wait, (1 - tokens) / rate)
+    end
+    levels[i] = tokens
+end
+if wait > 0 then
+    return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    redis.call('HSET', key, 't', tostring(levels[i] - 1), 'at', tostring(now))
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+return '0'
+"""
+
+
+class RedisBuckets:
+    def __init__(self, client, prefix="ratelimit:"):
+        self.prefix = prefix
+        self._take = client.register_script(TAKE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RATELIMIT_BACKEND='redis' requires the redis package")
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def take(self, checks):
+        keys = [self.prefix + key for key, _, _ in checks]
+        args = [time.time()]
+        for _, capacity, rate in checks:
+            args += [capacity, rate]
+        return float(self._take(keys=keys, args=args))
+
+
+class Budget:
+    def __init__(self, name, ip=None, user=None, inflight=0):
+        self.name = name
+        self.ip = parse_rate(ip)
+        self.user = parse_rate(user)
+        self.inflight = threading.BoundedSemaphore(inflight) if inflight else None
+
+    def checks(self, ip, user_id):
+        out = []
+        if self.ip:
+            out.append((f"{self.name}:ip:{ip}", *self.ip))
+        if self.user and user_id:
+            out.append((f"{self.name}:user:{user_id}", *self.user))
+        return out
+
+
+_store = MemoryBuckets()
+_budgets = {}
+_enabled = False
+
+
+def init_ratelimit(app):
+    """Pick the bucket store (defaults to the session backend) and load budgets."""
+    global _store, _budgets, _enabled
+    _enabled = app.config.get("RATELIMIT_ENABLED", True)
+    _budgets = {
+        name: Budget(name, **spec)
+        for name, spec in app.config.get("RATELIMIT_BUDGETS", {}).items()
+    }
+
+    backend = app.config.get("RATELIMIT_BACKEND") or app.config.get("SESSION_BACKEND", "memory")
+    if backend == "memory":
+        _store = MemoryBuckets()
+    elif backend == "redis":
+        url = app.config.get("RATELIMIT_REDIS_URL") or app.config["SESSION_REDIS_URL"]
+        _store = RedisBuckets.from_url(url)
+    else:
+        raise ValueError(f"Unknown RATELIMIT_BACKEND: {backend}")
+
+
+def too_many(retry_after):
+    response = jsonify({"error": "Too many requests - try again shortly"})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def _wait(budget):
+    checks = budget.checks(request.remote_addr or "unknown", (session.get("user") or {}).get("id"))
+    if not checks:
+        return 0
+    try:
+        return _store.take(checks)
+    except Exception as e:
+        logger.error(f"Rate limit check failed, allowing request: {e}")
+        return 0
+
+
+def rate_limited(view):
+    """Apply the budget of the view's blueprint (see RATELIMIT_BUDGETS)."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        budget = _budgets.get(request.blueprint)
+        if not _enabled or budget is None:
+            return view(*args, **kwargs)
+
+        # shed on concurrency first - it costs nothing and spends no tokens
+        if budget.inflight and not budget.inflight.acquire(blocking=False):
+            return too_many(SHED_RETRY_AFTER)
+        try:
+            wait = _wait(budget)
+            if wait:
+                return too_many(wait)
+            return view(*args, **kwargs)
+        finally:
+            if budget.inflight:
+                budget.inflight.release()
+    return wrapper
@@ -0,0 +1,228 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from app.analytics import estimated_1rm, normalize_name
+from app.cache import MISSING, TTLCache
+from app.pagination import apply_keyset, encode_cursor
+from app.supabase_client import slow_calls, supabase
+from app.conditional import touch
+
+#---------------------------------------------
+# Personal records
+#
+# personal_records holds one row per (user, exercise) with the heaviest
+# set and the best estimated 1RM seen so far. New sessions are compared
+# against that table (cached per user) and only improved exercises are
+# written, so detecting PRs never rescans history. rebuild() recomputes
+# the table in one streaming pass over workout_session, replacing each
+# user's rows in one transaction (replace_personal_records). Rebuilds
+# after a session edit / delete run in the background (rebuild_later).
+#
+#   python -m app.records            # backfill every user
+#   python -m app.records <user_id>  # backfill one user
+#---------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# user_profile columns kept in sync for the profile page
+PROFILE_PR_COLUMNS = {
+    "bench press": "bench_pr",
+    "bench": "bench_pr",
+    "squat": "squat_pr",
+    "back squat": "squat_pr",
+    "deadlift": "deadlift_pr",
+}
+
+_bests = TTLCache(maxsize=5_000, ttl=600)
+
+# one rebuild at a time per worker; they rescan a user's whole history
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="records")
+
+
+def _better(a, b):
+    """Merge two records for the same exercise, keeping the best of each kind."""
+    if b is None:
+        return a
+    best = dict(b)
+    if (a["weight"], a["reps"]) > (b["weight"], b["reps"]):
+        best.update(weight=a["weight"], reps=a["reps"], session_id=a["session_id"], achieved_at=a["achieved_at"])
+    best["estimated_1rm"] = max(a["estimated_1rm"], b["estimated_1rm"])
+    return best
+
+
+def session_bests(user_id, workout_plan, session_id, achieved_at):
+    """Best set per normalized exercise name within one session's plan."""
+    bests = {}
+    for ex in workout_plan.get("exercises", []):
+        key = normalize_name(ex.get("name", ""))
+        for st in ex.get("sets", []):
+            weight, reps = float(st.get("weight", 0)), int(st.get("reps", 0))
+            if reps <= 0:
+                continue
+            rec = {
+                "user_id": user_id,
+                "exercise": key,
+                "display_name": ex.get("name", key),
+                "weight": weight,
+                "reps": reps,
+                "estimated_1rm": round(float(estimated_1rm(weight, reps)), 2),
+                "session_id": session_id,
+                "achieved_at": achieved_at,
+            }
+            bests[key] = _better(rec, bests.get(key))
+    return bests
+
+
+def combine(bests, more):
+    """Fold another {exercise: record} map into `bests` in place."""
+    for key, rec in more.items():
+        bests[key] = _better(rec, bests.get(key))
+    return bests
+
+
+def load_bests(user_id):
+    """The user's best table as {exercise: record}, cached in-process."""
+    cached = _bests.get(user_id)
+    if cached is not MISSING:
+        return cached
+
+    res = supabase.table("personal_records").select("*").eq("user_id", user_id).execute()
+    bests = {row["exercise"]: row for row in res.data or []}
+    _bests.set(user_id, bests)
+    return bests
+
+
+def detect(user_id, workout_plan, session_id, achieved_at):
+    """
+    Compare a new session against the user's bests and persist any
+    improvements. Returns the list of new records.
+    """
+    return apply(user_id, session_bests(user_id, workout_plan, session_id, achieved_at))
+
+
+def apply(user_id, candidates):
+    """
+    Merge candidate bests ({exercise: record}, e.g. from session_bests)
+    into the user's table. The cached bests only decide which candidates
+    are worth sending; merge_personal_records keeps the stored values
+    monotonic, so a stale cache on another worker can never lower them.
+    Returns the records that actually improved.
+    """
+    current = load_bests(user_id)
+    maybe = []
+
+    for key, rec in candidates.items():
+        old = current.get(key)
+        if old is None or (
+            (rec["weight"], rec["reps"]) > (old["weight"], old["reps"])
+            or rec["estimated_1rm"] > old["estimated_1rm"]
+        ):
+            maybe.append(rec)
+
+    if not maybe:
+        return []
+
+    res = supabase.rpc("merge_personal_records", {"p_records": maybe}).execute()
+    improved = res.data or []
+    if len(improved) == len(maybe):
+        _bests.set(user_id, {**current, **{r["exercise"]: r for r in improved}})
+    else:
+        # some candidate lost to a value this worker hadn't seen
+        forget(user_id)
+
+    if improved:
+        _sync_profile(user_id, improved)
+    return improved
+
+
+def holds_record(user_id, session_id):
+    """Whether any of the user's current records was set in this session."""
+    res = (
+        supabase.table("personal_records")
+        .select("exercise")
+        .eq("user_id", user_id)
+        .eq("session_id", session_id)
+        .limit(1)
+        .execute()
+    )
+    return bool(res.data)
+
+
+def _sync_profile(user_id, records):
+    """Raise bench/squat/deadlift PR columns if a new record beats them."""
+    updates = {}
+    for rec in records:
+        column = PROFILE_PR_COLUMNS.get(rec["exercise"])
+        if column:
+            updates[column] = max(updates.get(column, 0), rec["weight"])
+
+    if not updates:
+        return
+
+    res = supabase.table("user_profile").select(", ".join(updates)).eq("id", user_id).limit(1).execute()
+    profile = res.data[0] if res.data else {}
+    # never lower a value the user entered by hand
+    updates = {c: w for c, w in updates.items() if w > (profile.get(c) or 0)}
+    if updates:
+        supabase.table("user_profile").update(updates).eq("id", user_id).execute()
+        touch(f"user:{user_id}")
+
+
+def forget(user_id):
+    _bests.pop(user_id)
+
+
+def rebuild(user_id=None, page_size=500):
+    """
+    Recompute personal_records from workout_session in a single streaming
+    pass (keyset-ordered by user), holding only one user's bests in memory.
+    """
+    def flush(uid, bests):
+        if uid is None:
+            return
+        rows = list(bests.values())
+        supabase.rpc("replace_personal_records", {"p_user_id": uid, "p_records": rows}).execute()
+        _sync_profile(uid, rows)
+        forget(uid)
+
+    current_user, bests, cursor, users = None, {}, None, 0
+    while True:
+        query = supabase.table("workout_session").select("id, user_id, created_at, workout_plan")
+        if user_id:
+            query = query.eq("user_id", user_id)
+        query = apply_keyset(query, cursor, desc=False, created_col="user_id")
+        with slow_calls():
+            rows = query.limit(page_size).execute().data or []
+
+        for row in rows:
+            if row["user_id"] != current_user:
+                flush(current_user, bests)
+                current_user, bests = row["user_id"], {}
+                users += 1
+            plan = row.get("workout_plan") or {}
+            combine(bests, session_bests(row["user_id"], plan, row["id"], row["created_at"]))
+
+        if len(rows) < page_size:
+            break
+        cursor = encode_cursor(rows[-1]["user_id"], rows[-1]["id"])
+
+    # a user with no sessions left still needs their old records cleared
+    flush(current_user if current_user or not user_id else user_id, bests)
+    logger.info(f"Rebuilt personal records for {users} user(s)")
+    return users
+
+
+def rebuild_later(user_id):
+    """Queue rebuild(user_id) on the background worker and return at once."""
+    def run():
+        try:
+            rebuild(user_id)
+        except Exception as e:
+            logger.error(f"PR rebuild failed for {user_id}: {e}")
+
+    _executor.submit(run)
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    rebuild(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,103 @@
+import gzip
+
+import msgspec
+from flask import request
+from flask.json.provider import JSONProvider
+
+#---------------------------------------------
+# Response layer: fast JSON + negotiated compression
+#
+# jsonify() goes through msgspec instead of the stdlib encoder. It is
+# several times faster on our large list payloads and encodes datetime,
+# date, uuid and decimal values natively, so handlers can return rows as
+# they come back from supabase.
+#
+# JSON / text responses above COMPRESS_MIN_SIZE are brotli (when the
+# `brotli` package is installed) or gzip compressed if the client accepts
+# it. Streamed responses (exports) are left alone.
+#---------------------------------------------
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ("application/json", "application/x-ndjson", "text/")
+
+# suffix appended to a representation's ETag per content coding, so a
+# compressed and an uncompressed body never share a validator
+ETAG_SUFFIXES = {"br": "-br", "gzip": "-gzip"}
+
+_encoder = msgspec.json.Encoder()
+_decoder = msgspec.json.Decoder()
+
+
+class MsgspecJSONProvider(JSONProvider):
+    """Flask JSON provider backed by msgspec."""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs):
+        return _encoder.encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return _decoder.decode(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # skip the str round-trip - the response body is bytes anyway
+        return self._app.response_class(_encoder.encode(obj), mimetype=self.mimetype)
+
+
+def choose_encoding(accept_encoding):
+    """Best content coding the client accepts, or None."""
+    if brotli is not None and accept_encoding["br"]:
+        return "br"
+    if accept_encoding["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress(data, encoding, level):
+    if encoding == "br":
+        return brotli.compress(data, quality=level["br"])
+    return gzip.compress(data, compresslevel=level["gzip"], mtime=0)
+
+
+def init_responses(app):
+    app.json = MsgspecJSONProvider(app)
+
+    min_size = app.config.get("COMPRESS_MIN_SIZE", 1024)
+    level = {
+        "gzip": app.config.get("COMPRESS_GZIP_LEVEL", 6),
+        "br": app.config.get("COMPRESS_BROTLI_QUALITY", 5),
+    }
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            request.method == "HEAD"
+            or response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or not response.mimetype.startswith(COMPRESSIBLE)
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        response.set_data(compress(data, encoding, level))
+        response.headers["Content-Encoding"] = encoding
+
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(etag + ETAG_SUFFIXES[encoding], weak)
+        return response
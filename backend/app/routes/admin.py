@@ -1,5 +1,14 @@
 from flask import Blueprint, jsonify, request, session
 from app.supabase_client import supabase
+from app import moderation, timeline, user_search
+from app.users import forget_user_id, resolve_user_id
+from app.admins import forget_admin, is_admin
+from app.listing_counts import cached_count, forget_counts
+from app.loaders import forget
+from app.conditional import touch, user_scopes
+from app.fanout import concurrently
+from app.pagination import InvalidCursor, apply_keyset, encode_cursor, parse_limit, quote
+from datetime import date, timedelta
 
 admin_bp = Blueprint("admin", __name__)
 
@@ -11,29 +20,222 @@ def require_admin():
     user_id = session["user"]["id"]
     
     # Check if user is admin
-    profile = supabase.table("user_profile").select("admin").eq("id", user_id).single().execute()
-    
-    if not profile.data or not profile.data.get("admin"):
+    if not is_admin(user_id):
         return jsonify({"error": "Forbidden - Admin access required"}), 403
     
     return None
 
 # ----------------------------
-# GET ALL USERS
+# LISTINGS
 # ----------------------------
-@admin_bp.route("/users", methods=["GET"])
-def get_all_users():
-    """Get all users ordered by creation date (most recent first)"""
+# Each admin listing is described by a spec: which columns may be
+# projected (?fields=), sorted on (?sort= / ?order=) and searched (?q=).
+# Listings are keyset-paginated on (sort key, id); exact totals come
+# from a count query cached per filter set (see app/listing_counts.py).
+
+USER_LISTING = {
+    "table": "user_profile",
+    "columns": {
+        "id": "id",
+        "username": "username",
+        "user_bio": "user_bio",
+        "profile_picture": "profile_picture",
+        "admin": "admin",
+        "bench_pr": "bench_pr",
+        "squat_pr": "squat_pr",
+        "deadlift_pr": "deadlift_pr",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    },
+    "default": ["id", "username", "admin", "created_at", "updated_at"],
+    "sorts": ["created_at", "username"],
+    # sort keys that may be NULL (see apply_keyset)
+    "nullable": ["username"],
+    "search": ["username", "user_bio"],
+}
+
+POST_LISTING = {
+    "table": "Posts",
+    "columns": {
+        "id": "id",
+        "title": "title",
+        "content": "content",
+        "like_count": "like_count",
+        "comment_count": "comment_count",
+        "created_at": "created_at",
+        "user_id": "user_id",
+        "user_profile": "user_profile!Posts_user_id_fkey(username)",
+    },
+    "default": ["id", "title", "content", "like_count", "created_at", "user_profile"],
+    "sorts": ["created_at", "like_count", "comment_count"],
+    "nullable": [],
+    "search": ["title", "content"],
+}
+
+PLAN_LISTING = {
+    "table": "workout_plans",
+    "columns": {
+        "id": "id",
+        "plan_name": "plan_name",
+        "description": "description",
+        "exercises": "exercises",
+        "created_at": "created_at",
+        "user_id": "user_id",
+        "user_profile": "user_profile!workout_plans_user_id_fkey(username)",
+    },
+    "default": ["id", "plan_name", "exercises", "created_at", "user_profile"],
+    "sorts": ["created_at", "plan_name"],
+    "nullable": ["plan_name"],
+    "search": ["plan_name", "description"],
+}
+
+
+class ListingError(ValueError):
+    pass
+
+
+def _like(text):
+    """*text* ilike pattern with the user's own wildcards escaped."""
+    text = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"*{text}*"
+
+
+def _listing_filters(spec, args):
+    """
+    Turn ?username= / ?from= / ?to= / ?admin= / ?q= into a list of
+    functions that narrow a query, plus a hashable key for the count cache.
+    Returns (filters, key), or (None, key) if the filters can match nothing.
+    """
+    filters, key = [], []
+
+    username = (args.get("username") or "").strip()
+    if username:
+        key.append(("username", username))
+        if spec is USER_LISTING:
+            filters.append(lambda q: q.ilike("username", _like(username)))
+        else:
+            # content listings filter on the exact author
+            author_id = resolve_user_id(username)
+            if not author_id:
+                return None, tuple(key)
+            filters.append(lambda q: q.eq("user_id", author_id))
+
+    for arg, op in (("from", "gte"), ("to", "lt")):
+        if arg in args:
+            try:
+                day = date.fromisoformat(args[arg])
+            except ValueError:
+                raise ListingError("from / to must be ISO dates (YYYY-MM-DD)")
+            if arg == "to":
+                day += timedelta(days=1)
+            key.append((arg, day.isoformat()))
+            filters.append(lambda q, op=op, day=day: getattr(q, op)("created_at", day.isoformat()))
+
+    if spec is USER_LISTING and args.get("admin") in ("true", "false"):
+        flag = args["admin"] == "true"
+        key.append(("admin", flag))
+        filters.append(lambda q: q.eq("admin", True) if flag else q.not_.is_("admin", "true"))
+
+    text = (args.get("q") or "").strip()
+    if text:
+        key.append(("q", text))
+        pattern = quote(_like(text))
+        filters.append(lambda q: q.or_(",".join(f"{col}.ilike.{pattern}" for col in spec["search"])))
+
+    return filters, tuple(key)
+
+
+def _count(spec, filters, key):
+    def load():
+        query = supabase.table(spec["table"]).select("id", count="exact", head=True)
+        for f in filters:
+            query = f(query)
+        return query.execute().count
+
+    return cached_count(spec["table"], key, load)
+
+
+def admin_listing(spec):
+    """
+    One page of an admin listing.
+    - ?limit= (default 50, max 200) / ?cursor=
+    - ?sort= one of spec["sorts"] (default created_at), ?order=asc|desc (default desc)
+    - ?fields= comma separated subset of spec["columns"]
+    - ?username=, ?from=, ?to=, ?q= (and ?admin=true|false for users)
+    Returns {"data": [...], "next_cursor", "total"}.
+    """
+    args = request.args
+    limit = parse_limit(args.get("limit"), default=50, maximum=200)
+
+    sort = args.get("sort", "created_at")
+    if sort not in spec["sorts"]:
+        raise ListingError(f"sort must be one of {', '.join(spec['sorts'])}")
+    order = args.get("order", "desc")
+    if order not in ("asc", "desc"):
+        raise ListingError("order must be asc or desc")
+
+    fields = args.get("fields")
+    fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else spec["default"]
+    unknown = [f for f in fields if f not in spec["columns"]]
+    if unknown:
+        raise ListingError(f"Unknown fields: {', '.join(unknown)}")
+    # the cursor needs the sort key and id on every row
+    columns = ", ".join(spec["columns"][f] for f in dict.fromkeys(["id", sort, *fields]))
+
+    filters, key = _listing_filters(spec, args)
+    if filters is None:
+        return {"data": [], "next_cursor": None, "total": 0}
+
+    # a cursor only continues the ordering it was issued for
+    scope = f"{sort}:{order}"
+
+    query = supabase.table(spec["table"]).select(columns)
+    for f in filters:
+        query = f(query)
+    try:
+        query = apply_keyset(
+            query, args.get("cursor"), desc=order == "desc",
+            created_col=sort, nullable=sort in spec["nullable"], scope=scope,
+        )
+    except InvalidCursor as e:
+        raise ListingError(str(e))
+
+    # the count is usually cached; when not, run it alongside the page
+    page_res, total = concurrently(
+        query.limit(limit + 1).execute,
+        lambda: _count(spec, filters, key),
+    )
+
+    rows = page_res.data or []
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][sort]
+        next_cursor = encode_cursor(None if last is None else str(last), rows[-1]["id"], scope)
+    return {"data": rows, "next_cursor": next_cursor, "total": total}
+
+
+def listing_response(spec):
     auth_check = require_admin()
     if auth_check:
         return auth_check
-    
+
     try:
-        response = supabase.table("user_profile").select("*").order("created_at", desc=True).execute()
-        return jsonify(response.data), 200
+        return jsonify(admin_listing(spec)), 200
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
+# ----------------------------
+# GET ALL USERS
+# ----------------------------
+@admin_bp.route("/users", methods=["GET"])
+def get_all_users():
+    """Page through users (newest first by default); see admin_listing for parameters."""
+    return listing_response(USER_LISTING)
+
 # ----------------------------
 # DELETE USER
 # ----------------------------
@@ -47,11 +249,19 @@ def delete_user_admin(user_id):
     try:
         # Delete from auth.users via Supabase Admin API
         # Note: This requires admin privileges
+        # post_likes cascade without touching like_count; see purge_post_likes
+        supabase.rpc("purge_post_likes", {"p_user_ids": [user_id]}).execute()
         response = supabase.table("user_profile").delete().eq("id", user_id).execute()
         
         if not response.data:
             return jsonify({"error": "User not found"}), 404
-        
+
+        forget_user_id(user_id)
+        forget_admin(user_id)
+        forget("user_profile", user_id)
+        user_search.remove(response.data[0].get("username"))
+        touch(*user_scopes(user_id))
+        forget_counts()
         return jsonify({"message": "User deleted successfully"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -61,18 +271,8 @@ def delete_user_admin(user_id):
 # ----------------------------
 @admin_bp.route("/posts", methods=["GET"])
 def get_all_posts():
-    """Get all posts ordered by creation date (most recent first)"""
-    auth_check = require_admin()
-    if auth_check:
-        return auth_check
-    
-    try:
-        response = supabase.table("Posts").select(
-            "id, content, title, like_count, created_at, user_profile!Posts_user_id_fkey(username)"
-        ).order("created_at", desc=True).execute()
-        return jsonify(response.data), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    """Page through posts (newest first by default); see admin_listing for parameters."""
+    return listing_response(POST_LISTING)
 
 # ----------------------------
 # DELETE POST
@@ -89,7 +289,10 @@ def delete_post_admin(post_id):
         
         if not response.data:
             return jsonify({"error": "Post not found"}), 404
-        
+
+        timeline.safely(timeline.retract, post_id)
+        touch("posts", f"post:{post_id}")
+        forget_counts()
         return jsonify({"message": "Post deleted successfully"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -99,18 +302,8 @@ def delete_post_admin(post_id):
 # ----------------------------
 @admin_bp.route("/workout-plans", methods=["GET"])
 def get_all_workout_plans():
-    """Get all workout plans ordered by creation date (most recent first)"""
-    auth_check = require_admin()
-    if auth_check:
-        return auth_check
-    
-    try:
-        response = supabase.table("workout_plans").select(
-            "*, user_profile!workout_plans_user_id_fkey(username)"
-        ).order("created_at", desc=True).execute()
-        return jsonify(response.data), 200
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    """Page through workout plans (newest first by default); see admin_listing for parameters."""
+    return listing_response(PLAN_LISTING)
 
 # ----------------------------
 # DELETE WORKOUT PLAN
@@ -127,7 +320,176 @@ def delete_workout_plan_admin(plan_id):
         
         if not response.data:
             return jsonify({"error": "Workout plan not found"}), 404
-        
+
+        touch(f"plans:{response.data[0]['user_id']}")
+        forget_counts()
         return jsonify({"message": "Workout plan deleted successfully"}), 200
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+# ----------------------------
+# BULK DELETES
+# ----------------------------
+# Body is {"ids": [...]} or {"filter": {...}}, where the filter takes the
+# same username / from / to / q (and admin, for users) keys as the
+# listing query string. One admin check per request; rows go in chunked
+# in_() deletes and every requested id gets an outcome.
+FILTER_PAGE_SIZE = 1000
+
+
+def _matching_ids(spec, filters):
+    """Ids of every row the listing filters match, paged on id."""
+    ids, last_id = [], None
+    while True:
+        query = supabase.table(spec["table"]).select("id").order("id")
+        for f in filters:
+            query = f(query)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = query.limit(FILTER_PAGE_SIZE).execute().data or []
+        ids.extend(row["id"] for row in rows)
+        if len(ids) > moderation.MAX_BULK_IDS:
+            raise ListingError(f"Filter matches more than {moderation.MAX_BULK_IDS} rows - narrow it down")
+        if len(rows) < FILTER_PAGE_SIZE:
+            return ids
+        last_id = rows[-1]["id"]
+
+
+def _bulk_targets(spec, id_kind):
+    """(ids, outcomes) for a bulk delete body; outcomes holds rejected ids."""
+    body = request.get_json(silent=True) or {}
+    ids, filter_args = body.get("ids"), body.get("filter")
+    if (ids is None) == (filter_args is None):
+        raise ListingError("Provide either ids or filter")
+
+    if ids is not None:
+        if not isinstance(ids, list) or not ids:
+            raise ListingError("ids must be a non-empty list")
+        if len(ids) > moderation.MAX_BULK_IDS:
+            raise ListingError(f"At most {moderation.MAX_BULK_IDS} ids per request")
+        return moderation.parse_ids(ids, id_kind)
+
+    if not isinstance(filter_args, dict):
+        raise ListingError("filter must be an object")
+    # same parsing as the query string: JSON true / false become "true" / "false"
+    filter_args = {
+        k: str(v).lower() if isinstance(v, bool) else str(v)
+        for k, v in filter_args.items() if v is not None
+    }
+    filters, key = _listing_filters(spec, filter_args)
+    if not key:
+        raise ListingError("filter must set at least one of username, from, to, q or admin")
+    if filters is None:
+        return [], {}
+    return _matching_ids(spec, filters), {}
+
+
+@moderation.on_purged
+def _forget_users(purged):
+    """Drop cached state for accounts a purge job removed."""
+    for user_id, username in purged.items():
+        forget_user_id(user_id)
+        forget_admin(user_id)
+        user_search.remove(username)
+        touch(*user_scopes(user_id))
+    forget_counts()
+
+
+@admin_bp.route("/users/bulk-delete", methods=["POST"])
+def bulk_delete_users():
+    """
+    Queue a background purge of many accounts and everything they own.
+    Returns 202 with the job and a per-id outcome ("queued", "not_found",
+    "invalid", or "skipped" for the caller's own account); poll
+    /admin/jobs/<id> for the final outcomes.
+    """
+    auth_check = require_admin()
+    if auth_check:
+        return auth_check
+
+    try:
+        user_ids, results = _bulk_targets(USER_LISTING, "uuid")
+
+        me = session["user"]["id"]
+        if me in user_ids:
+            user_ids.remove(me)
+            results[me] = "skipped"
+
+        found = {row["id"] for row in moderation.existing_ids("user_profile", user_ids)}
+        queued = [id_ for id_ in user_ids if id_ in found]
+        results.update({id_: "queued" if id_ in found else "not_found" for id_ in user_ids})
+
+        if not queued:
+            return jsonify({"job": None, "results": results}), 200
+
+        job = moderation.start_user_purge(queued, me)
+        return jsonify({"job": {"id": job["id"], "status": job["status"]}, "results": results}), 202
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route("/posts/bulk-delete", methods=["POST"])
+def bulk_delete_posts():
+    """Delete many posts; returns {"results": {id: outcome}, "deleted": n}."""
+    auth_check = require_admin()
+    if auth_check:
+        return auth_check
+
+    try:
+        post_ids, results = _bulk_targets(POST_LISTING, "int")
+        deleted, outcomes = moderation.delete_in("Posts", post_ids)
+        results.update(outcomes)
+
+        if deleted:
+            gone = [row["id"] for row in deleted]
+            timeline.safely(timeline.retract_many, gone)
+            touch("posts", *(f"post:{id_}" for id_ in gone))
+            forget_counts()
+        return jsonify({"results": results, "deleted": len(deleted)}), 200
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route("/workout-plans/bulk-delete", methods=["POST"])
+def bulk_delete_workout_plans():
+    """Delete many workout plans; returns {"results": {id: outcome}, "deleted": n}."""
+    auth_check = require_admin()
+    if auth_check:
+        return auth_check
+
+    try:
+        plan_ids, results = _bulk_targets(PLAN_LISTING, "int")
+        deleted, outcomes = moderation.delete_in("workout_plans", plan_ids)
+        results.update(outcomes)
+
+        if deleted:
+            touch(*{f"plans:{row['user_id']}" for row in deleted})
+            forget_counts()
+        return jsonify({"results": results, "deleted": len(deleted)}), 200
+    except ListingError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# ----------------------------
+# MODERATION JOBS
+# ----------------------------
+@admin_bp.route("/jobs/<int:job_id>", methods=["GET"])
+def get_moderation_job(job_id):
+    """Status and per-id outcomes of a background moderation job."""
+    auth_check = require_admin()
+    if auth_check:
+        return auth_check
+
+    try:
+        job = moderation.get_job(job_id)
+        if not job:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(job), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
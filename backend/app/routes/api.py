@@ -1,4 +1,6 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, session
+from app.admins import is_admin
+from app.supabase_client import pool_stats
 
 api_bp = Blueprint('api', __name__)
 
@@ -6,6 +8,15 @@ api_bp = Blueprint('api', __name__)
 def status():
         return jsonify({'status':'API Active'}), 200
 
+@api_bp.route('/status/pool', methods=['GET'])
+def pool_status():
+        """Supabase connection pool utilisation for this worker (admins only)."""
+        if "user" not in session:
+                return jsonify({"error": "Unauthorized"}), 401
+        if not is_admin(session["user"]["id"]):
+                return jsonify({"error": "Forbidden - Admin access required"}), 403
+        return jsonify(pool_stats()), 200
+
 
 """
 Main API Routes
@@ -1,9 +1,16 @@
 from flask import Blueprint, jsonify, request, session
 from app.supabase_client import supabase  
+from app.users import forget_username
+from app import user_search
+from app.admins import prime_admin
+from app.listing_counts import forget_counts
+from app.loaders import loader
+from app.ratelimit import rate_limited
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/login', methods= ['POST'])
+@rate_limited
 def login():
     data = request.json
     email = data.get("email")
@@ -20,15 +27,18 @@ def login():
 
         if res.user:
             # fetch username and admin status from user_profile
-            profile = supabase.table("user_profile").select("username, admin").eq("id", res.user.id).single().execute()
+            profile = loader("user_profile", columns="username, admin").load(res.user.id)
             
-            print("Profile data:", profile.data)  # Debug log
+            print("Profile data:", profile)  # Debug log
             
-            username = profile.data["username"] if profile.data else None
-            is_admin = profile.data.get("admin", False) if profile.data else False
+            username = profile["username"] if profile else None
+            is_admin = profile.get("admin", False) if profile else False
             
             print(f"Username: {username}, is_admin: {is_admin}")  # Debug log
 
+            # fresh read - saves the first admin page a lookup
+            prime_admin(res.user.id, is_admin)
+
             # store user info in session
             session["user"] = {
                 "id": res.user.id,
@@ -51,6 +61,7 @@ def login():
 
 
 @auth_bp.route('/signup', methods=['POST'])
+@rate_limited
 def signup():
     data = request.json
     email = data.get("email")
@@ -71,6 +82,11 @@ def signup():
 
         print("Signup response:", res)
 
+        # the name may have been looked up (and cached as unknown) before
+        forget_username(username)
+        user_search.add(username)
+        forget_counts()
+
         return jsonify({
             "message": "Signup successful. Please verify your email to activate your account.",
             "email": email
@@ -97,6 +113,7 @@ def status():
     return jsonify({"authenticated": False}), 200
 
 @auth_bp.route("/reset-password", methods=["POST"])
+@rate_limited
 def reset_password():
     data = request.get_json()
     password = data.get("password")
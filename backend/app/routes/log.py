@@ -1,17 +1,75 @@
 from urllib import response
-from flask import Blueprint, request, jsonify, session
-from app.supabase_client import supabase
-from datetime import datetime, timezone, timedelta
+from flask import Blueprint, Response, request, jsonify, session
+from app.supabase_client import slow_calls, supabase
+from app.loaders import forget, loader
+from app.pagination import InvalidCursor, apply_keyset, page, parse_limit
+from datetime import date, datetime, timezone, timedelta
 from pydantic import ValidationError
-from app.schemas import WorkoutCreate
+from app.schemas import WorkoutCreate, WorkoutPlan
+from app import analytics, exercise_index, records, session_export, session_import, volume
+from app.config import Config
+from app.conditional import conditional, touch
+from app.ratelimit import rate_limited
+import csv
+import logging
 
 workout_logs_bp = Blueprint("sessions", __name__)
+logger = logging.getLogger(__name__)
+
+# ?fields= names for GET /sessions -> postgrest select expressions
+SESSION_FIELDS = {
+    "id": "id",
+    "created_at": "created_at",
+    "notes": "notes",
+    "total_volume": "total_volume",
+    "name": "name:workout_plan->>name",
+    "workout_plan": "workout_plan",
+}
+SUMMARY_FIELDS = ["id", "created_at", "name", "notes", "total_volume"]
+MAX_SESSION_PAGE = 100
+
+
+def record_volume(user_id, at, delta, sessions):
+    """Push a volume change into the rollups without failing the request."""
+    try:
+        volume.record(user_id, at, delta, sessions)
+    except Exception as e:
+        logger.error(f"Volume rollup update failed for {user_id}: {e}")
+
+
+def session_scopes(*args, **kwargs):
+    user = session.get("user")
+    return [f"sessions:{user['id']}"] if user else None
+
+
+def update_index(fn, *args):
+    """Keep the exercise history index in step without failing the request."""
+    try:
+        fn(*args)
+    except Exception as e:
+        logger.error(f"Exercise index {fn.__name__} failed: {e}")
+
+
+def update_records(user_id, session_id, performed_at, workout_plan):
+    """
+    Re-check personal records after a session's plan was edited. A record
+    set in this session may have been a typo, so those are recomputed from
+    history in the background; otherwise the edit can only add records.
+    """
+    try:
+        if records.holds_record(user_id, session_id):
+            records.rebuild_later(user_id)
+        else:
+            records.detect(user_id, workout_plan, session_id, performed_at)
+    except Exception as e:
+        logger.error(f"PR update failed for {user_id}: {e}")
 
 
 # ----------------------------
 # CREATE A WORKOUT SESSION
 # ----------------------------
 @workout_logs_bp.route("", methods=["POST"])
+@rate_limited
 def create_workout_session():
     if "user" not in session:
         return jsonify({"error": "Unauthorized"}), 401
@@ -22,16 +80,13 @@ def create_workout_session():
         return jsonify({"errors": e.errors()}), 400
 
     # Calculate total volume
-    total_volume = 0
-    for ex in data.workoutPlan.exercises:
-        for s in ex.sets:
-            total_volume += s.weight * s.reps
+    total_volume = volume.session_volume(data.workoutPlan)
 
     record = {
         "user_id": session["user"]["id"],
         "notes": data.notes,
         "workout_plan": data.workoutPlan.model_dump(),
-        "total_volume": float(total_volume),
+        "total_volume": total_volume,
         "created_at": datetime.now(timezone.utc).isoformat(),
     }
 
@@ -40,25 +95,244 @@ def create_workout_session():
     if not response.data:
         return jsonify({"error": "Failed to create workout session"}), 500
 
-    return jsonify(response.data[0]), 201
+    created = response.data[0]
+    record_volume(record["user_id"], record["created_at"], total_volume, 1)
+    update_index(exercise_index.index_sessions, record["user_id"], [{**record, "id": created.get("id")}])
+    touch(f"sessions:{record['user_id']}")
+
+    # compare against the cached best table - no history rescan
+    try:
+        created["new_records"] = records.detect(
+            record["user_id"], record["workout_plan"], created.get("id"), record["created_at"]
+        )
+    except Exception as e:
+        logger.error(f"PR detection failed for {record['user_id']}: {e}")
+        created["new_records"] = []
+
+    return jsonify(created), 201
+
+# ----------------------------
+# BULK IMPORT WORKOUT SESSIONS
+# ----------------------------
+@workout_logs_bp.route("/import", methods=["POST"])
+@rate_limited
+def import_workout_sessions():
+    """
+    Import many sessions from an NDJSON or CSV body (see app/session_import.py).
+    Format comes from ?format= or the Content-Type; ?batch_size= sets rows
+    per insert. Valid rows are imported, invalid ones reported by line.
+    """
+    if "user" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    fmt = request.args.get("format")
+    if not fmt:
+        fmt = "csv" if request.mimetype == "text/csv" else "ndjson"
+    if fmt not in session_import.FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(session_import.FORMATS)}"}), 400
+
+    try:
+        batch_size = int(request.args.get("batch_size", Config.SESSION_IMPORT_BATCH_SIZE))
+    except ValueError:
+        return jsonify({"error": "batch_size must be an integer"}), 400
+    batch_size = max(1, min(batch_size, Config.SESSION_IMPORT_BATCH_SIZE))
+
+    try:
+        summary = session_import.run(
+            session["user"]["id"], request.stream, fmt, batch_size, Config.SESSION_IMPORT_MAX_ROWS
+        )
+    except (UnicodeDecodeError, csv.Error) as e:
+        return jsonify({"error": f"Unreadable {fmt} body: {e}"}), 400
+    except Exception as e:
+        logger.error(f"Session import failed: {e}")
+        return jsonify({"error": "Failed to import sessions"}), 500
+    finally:
+        touch(f"sessions:{session['user']['id']}")
+
+    return jsonify(summary), 200 if summary["imported"] or not summary["failed"] else 400
 
 # ----------------------------
-# GET ALL WORKOUT SESSIONS FOR THE USER
+# LIST WORKOUT SESSIONS FOR THE USER
 # ----------------------------
 @workout_logs_bp.route("", methods=["GET"])
+@conditional(session_scopes)
 def get_user_workout_sessions():
+    """
+    One page of the user's sessions, newest first.
+    - ?limit= / ?cursor= keyset pagination on (created_at, id)
+    - ?from= / ?to= ISO dates (inclusive)
+    - ?fields= comma separated subset of SESSION_FIELDS; defaults to a
+      summary without the workout_plan blob (GET /sessions/<id> has it)
+    Returns {"data": [...], "next_cursor": str | None}.
+    """
     if "user" not in session:
         return jsonify({"error": "Unauthorized"}), 401
 
     user_id = session["user"]["id"]
-    
+    limit = parse_limit(request.args.get("limit"), maximum=MAX_SESSION_PAGE)
+
+    fields = request.args.get("fields")
+    fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else SUMMARY_FIELDS
+    unknown = [f for f in fields if f not in SESSION_FIELDS]
+    if unknown:
+        return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+    # the cursor needs created_at and id on every row
+    columns = ", ".join(SESSION_FIELDS[f] for f in dict.fromkeys(["id", "created_at", *fields]))
+
     try:
-        response = supabase.table("workout_session").select("*").eq("user_id", user_id).execute()
-        return jsonify(response.data), 200
+        start = date.fromisoformat(request.args["from"]) if "from" in request.args else None
+        end = date.fromisoformat(request.args["to"]) if "to" in request.args else None
+    except ValueError:
+        return jsonify({"error": "from / to must be ISO dates (YYYY-MM-DD)"}), 400
+
+    query = supabase.table("workout_session").select(columns).eq("user_id", user_id)
+    if start:
+        query = query.gte("created_at", start.isoformat())
+    if end:
+        query = query.lt("created_at", (end + timedelta(days=1)).isoformat())
+    try:
+        query = apply_keyset(query, request.args.get("cursor"))
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        response = query.limit(limit + 1).execute()
+        sessions, next_cursor = page(response.data, limit)
+        return jsonify({"data": sessions, "next_cursor": next_cursor}), 200
     except Exception as e:
         return jsonify({"error": "Failed to fetch sessions"}), 500
 
 
+# ----------------------------
+# EXPORT WORKOUT SESSIONS
+# ----------------------------
+@workout_logs_bp.route("/export", methods=["GET"])
+def export_workout_sessions():
+    """
+    Stream every session as NDJSON (default) or CSV (?format=csv), paged
+    from the database as it is sent. ?gzip=1 returns a .gz download.
+    """
+    if "user" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in session_import.FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(session_import.FORMATS)}"}), 400
+    gzip = request.args.get("gzip") in ("1", "true")
+
+    filename = f"workout_sessions.{fmt}" + (".gz" if gzip else "")
+    mimetype = "application/gzip" if gzip else ("text/csv" if fmt == "csv" else "application/x-ndjson")
+
+    return Response(
+        session_export.stream(session["user"]["id"], fmt, gzip),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# ----------------------------
+# PER-EXERCISE ANALYTICS
+# ----------------------------
+@workout_logs_bp.route("/analytics", methods=["GET"])
+@conditional(session_scopes)
+def get_session_analytics():
+    """
+    Per-exercise tonnage, estimated 1RM, best sets, weekly trend and
+    rep-range distribution over the user's sessions.
+    Optional ?from= / ?to= ISO dates limit the window.
+    """
+    if "user" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        start = date.fromisoformat(request.args["from"]) if "from" in request.args else None
+        end = date.fromisoformat(request.args["to"]) if "to" in request.args else None
+    except ValueError:
+        return jsonify({"error": "from / to must be ISO dates (YYYY-MM-DD)"}), 400
+
+    try:
+        sessions = fetch_sessions(session["user"]["id"], "created_at, workout_plan", start, end)
+        return jsonify({"exercises": analytics.summarize(sessions)}), 200
+    except Exception as e:
+        return jsonify({"error": "Failed to compute analytics"}), 500
+
+
+# ----------------------------
+# PER-EXERCISE HISTORY
+# ----------------------------
+@workout_logs_bp.route("/exercises/<path:name>/history", methods=["GET"])
+@conditional(session_scopes)
+def get_exercise_history(name):
+    """
+    Every logged session of one exercise, from the exercise history index.
+    Names match case / whitespace insensitively ("Bench  press" == "bench press").
+    - ?limit= / ?cursor= pagination, ?order=asc (default, oldest first) | desc
+    Returns {"exercise", "data": [...], "next_cursor"}.
+    """
+    if "user" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    order = request.args.get("order", "asc")
+    if order not in ("asc", "desc"):
+        return jsonify({"error": "order must be asc or desc"}), 400
+    limit = parse_limit(request.args.get("limit"), maximum=MAX_SESSION_PAGE)
+
+    try:
+        rows, next_cursor = exercise_index.history(
+            session["user"]["id"], name, limit, request.args.get("cursor"), desc=order == "desc"
+        )
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": "Failed to fetch exercise history"}), 500
+
+    return jsonify({
+        "exercise": exercise_index.exercise_key(name),
+        "data": rows,
+        "next_cursor": next_cursor,
+    }), 200
+
+
+def fetch_sessions(user_id, columns, start=None, end=None, page_size=1000):
+    """All of a user's sessions (oldest first), paged past the API row cap."""
+    rows, offset = [], 0
+    while True:
+        query = supabase.table("workout_session").select(columns).eq("user_id", user_id)
+        if start:
+            query = query.gte("created_at", start.isoformat())
+        if end:
+            query = query.lt("created_at", (end + timedelta(days=1)).isoformat())
+
+        with slow_calls():
+            res = query.order("created_at").order("id").range(offset, offset + page_size - 1).execute()
+        rows.extend(res.data or [])
+        if len(res.data or []) < page_size:
+            return rows
+        offset += page_size
+
+
+# ----------------------------
+# GET ONE WORKOUT SESSION
+# ----------------------------
+@workout_logs_bp.route("/<session_id>", methods=["GET"])
+@conditional(session_scopes)
+def get_workout_session(session_id):
+    """Full session, including the workout_plan."""
+    if "user" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    try:
+        found = loader("workout_session").load(session_id)
+    except Exception as e:
+        return jsonify({"error": "Failed to fetch session"}), 500
+
+    if not found:
+        return jsonify({"error": "Workout session not found"}), 404
+    if found["user_id"] != session["user"]["id"]:
+        return jsonify({"error": "Forbidden"}), 403
+    return jsonify(found), 200
+
+
 # ----------------------------
 # UPDATE AN EXISTING WORKOUT SESSION
 # ----------------------------
@@ -68,10 +342,10 @@ def update_workout_session(session_id):
         return jsonify({"error": "Unauthorized"}), 401
 
     # Verify ownership
-    response = supabase.table("workout_session").select("user_id").eq("id", session_id).single().execute()
-    if not response.data:
+    existing = loader("workout_session", columns="user_id, total_volume, created_at").load(session_id)
+    if not existing:
         return jsonify({"error": "Workout session not found"}), 404
-    if response.data["user_id"] != session["user"]["id"]:
+    if existing["user_id"] != session["user"]["id"]:
         return jsonify({"error": "Forbidden"}), 403
 
     data_json = request.get_json()
@@ -82,19 +356,71 @@ def update_workout_session(session_id):
     if "notes" in data_json:
         updates["notes"] = data_json["notes"]
     if "workoutPlan" in data_json:
-        # Validate the workoutPlan if needed
+        # Validate the workoutPlan and keep total_volume in step with it
         try:
-            validated_plan = WorkoutCreate.WorkoutPlan.parse_obj(data_json["workoutPlan"])
-            updates["workout_plan"] = validated_plan
+            validated_plan = WorkoutPlan.model_validate(data_json["workoutPlan"])
+            updates["workout_plan"] = validated_plan.model_dump()
+            updates["total_volume"] = volume.session_volume(validated_plan)
         except ValidationError as e:
             return jsonify({"errors": e.errors()}), 400
 
     # Perform update
     try:
         update_response = supabase.table("workout_session").update(updates).eq("id", session_id).execute()
+        forget("workout_session", session_id)
+        touch(f"sessions:{existing['user_id']}")
+
+        if "total_volume" in updates:
+            delta = updates["total_volume"] - (existing.get("total_volume") or 0)
+            record_volume(existing["user_id"], existing["created_at"], delta, 0)
+        if "workout_plan" in updates:
+            update_index(
+                exercise_index.reindex_session,
+                existing["user_id"], session_id, existing["created_at"], updates["workout_plan"],
+            )
+            update_records(existing["user_id"], session_id, existing["created_at"], updates["workout_plan"])
         
         # Return the updated session
-        updated_session = supabase.table("workout_session").select("*").eq("id", session_id).single().execute()
-        return jsonify(updated_session.data), 200
+        updated_session = loader("workout_session").load(session_id)
+        return jsonify(updated_session), 200
     except Exception as e:
-        return jsonify({"error": "Failed to update session"}), 500
\ No newline at end of file
+        return jsonify({"error": "Failed to update session"}), 500
+
+
+# ----------------------------
+# DELETE A WORKOUT SESSION
+# ----------------------------
+@workout_logs_bp.route("/<session_id>", methods=["DELETE"])
+def delete_workout_session(session_id):
+    if "user" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    existing = loader("workout_session", columns="id, user_id, total_volume, created_at").load(session_id)
+    if not existing:
+        return jsonify({"error": "Workout session not found"}), 404
+    if existing["user_id"] != session["user"]["id"]:
+        return jsonify({"error": "Forbidden"}), 403
+
+    user_id = existing["user_id"]
+    # only records set in this session need recomputing from history;
+    # check before the delete nulls their session_id
+    try:
+        held = records.holds_record(user_id, existing["id"])
+    except Exception as e:
+        logger.error(f"PR lookup failed for {user_id}: {e}")
+        held = False
+
+    # exercise_history rows go with the session (on delete cascade)
+    try:
+        supabase.table("workout_session").delete().eq("id", session_id).execute()
+        forget("workout_session", session_id)
+        touch(f"sessions:{user_id}")
+    except Exception as e:
+        return jsonify({"error": "Failed to delete session"}), 500
+
+    record_volume(user_id, existing["created_at"], -(existing.get("total_volume") or 0), -1)
+
+    if held:
+        records.rebuild_later(user_id)
+
+    return jsonify({"message": "Workout session deleted"}), 200
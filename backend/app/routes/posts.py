@@ -1,21 +1,37 @@
 # app/routes/posts.py
 from flask import Blueprint, request, jsonify, session
 from app.supabase_client import supabase
+from postgrest.exceptions import APIError
+from app.pagination import InvalidCursor, apply_keyset, decode_cursor, encode_cursor, page, parse_limit
+from app import timeline
+from app.users import resolve_user_id
+from app.loaders import forget, loader
+from app.fanout import concurrently
+from app.conditional import conditional, touch
+from app.ratelimit import rate_limited
+from app.listing_counts import forget_counts
 from datetime import datetime, timezone
 import uuid
 
 posts_bp = Blueprint("posts", __name__)
 
+# columns shipped in feed listings - counts only, no comments / liked_by arrays
+FEED_COLUMNS = "id, content, like_count, comment_count, created_at, title, user_profile!Posts_user_id_fkey(username)"
+
+# longest ?q= accepted by /posts/search
+MAX_QUERY_LENGTH = 200
+
 # ----------------------------
 # CREATE POST
 # ----------------------------
 @posts_bp.route("", methods=["POST"])  # Changed from "/" to ""
 @posts_bp.route("/", methods=["POST"])  # Keep this for compatibility
+@rate_limited
 def create_post():
     """
     Create a new post.
     -user_id in posts table is a foreign key to user_profile table referencing user_id
-    - Initializes like_count to 0 and comments as an empty list.
+    - Initializes like_count to 0; comments live in post_comments.
     """
     if "user" not in session:
         return jsonify({"error": "Unauthorized"}), 401
@@ -23,22 +39,27 @@ def create_post():
     user = session["user"]  # user profile from login
     data = request.get_json()
 
-    profile = supabase.table("user_profile").select("id").eq("id", user["id"]).single().execute()
+    profile = loader("user_profile", columns="id").load(user["id"])
 
-    if not profile.data:
+    if not profile:
         return jsonify({"error": "User profile not found"}), 404
 
     post = {
-        "user_id": profile.data["id"],
+        "user_id": profile["id"],
         "content": data.get("content"),
         "like_count": 0,
-        "comments": [],
         "created_at": datetime.now(timezone.utc).isoformat(),
         "title": data.get("title")
     }
 
     response = supabase.table("Posts").insert(post).execute()
-    return jsonify(response.data[0]), 201
+    created = response.data[0]
+
+    # readers' timelines fill in shortly after; the post itself is committed
+    timeline.in_background(timeline.fan_out, created)
+    touch("posts")
+    forget_counts()
+    return jsonify(created), 201
 
 
 # ----------------------------
@@ -46,59 +67,154 @@ def create_post():
 # ----------------------------
 @posts_bp.route("", methods=["GET"])  # Changed from "/" to ""
 @posts_bp.route("/", methods=["GET"])  # Keep this for compatibility
+@conditional(lambda: ["posts", "names"])
 def get_posts():
     """
-    Fetch all posts.
+    Fetch one page of the feed, newest first.
+    - ?limit= page size (capped at MAX_PAGE_SIZE), ?cursor= from the previous page.
+    - Ships comment_count / like_count / liked_by_me instead of the full arrays.
+    Returns {"data": [...], "next_cursor": str | None}.
+    """
+    limit = parse_limit(request.args.get("limit"))
+
+    query = supabase.table("Posts").select(FEED_COLUMNS)
+    try:
+        query = apply_keyset(query, request.args.get("cursor"))
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = query.limit(limit + 1).execute()
+    posts, next_cursor = page(response.data, limit)
+
+    mark_liked_by_me(posts)
+    return jsonify({"data": posts, "next_cursor": next_cursor}), 200
+
+
+# ----------------------------
+# HOME TIMELINE (posts from people I follow)
+# ----------------------------
+@posts_bp.route("/timeline", methods=["GET"])
+def get_timeline():
+    """
+    Fetch one page of the logged-in user's home timeline, newest first.
+    Served from the fan-out timeline store as a single range read.
+    Returns {"data": [...], "next_cursor": str | None}.
     """
-    response = supabase.table("Posts").select(
-        "id, content, like_count, comments, created_at, title, liked_by, user_profile!Posts_user_id_fkey(username)"   
-    ).execute()
-    return jsonify(response.data), 200
+    if "user" not in session:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    limit = parse_limit(request.args.get("limit"))
+
+    try:
+        posts, next_cursor = timeline.read(
+            session["user"]["id"], FEED_COLUMNS, limit, request.args.get("cursor")
+        )
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    mark_liked_by_me(posts)
+    return jsonify({"data": posts, "next_cursor": next_cursor}), 200
+
+
+# ----------------------------
+# SEARCH POSTS
+# ----------------------------
+@posts_bp.route("/search", methods=["GET"])
+@conditional(lambda: ["posts", "names"])
+def search_posts():
+    """
+    Full-text search over post titles and content, best match first.
+    - ?q= search terms (quoted phrases, -exclusions and OR are supported)
+    - ?limit= / ?cursor= pagination
+    Served by the GIN index on Posts.search_vector (see migration 011).
+    Returns {"data": [...], "next_cursor": str | None}.
+    """
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "q is required"}), 400
+    if len(q) > MAX_QUERY_LENGTH:
+        return jsonify({"error": f"q must be at most {MAX_QUERY_LENGTH} characters"}), 400
+
+    limit = parse_limit(request.args.get("limit"))
+    params = {"p_query": q, "p_limit": limit + 1}
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            rank, post_id = decode_cursor(cursor)
+            params.update(p_after_rank=float(rank), p_after_id=int(post_id))
+        except (InvalidCursor, TypeError, ValueError):
+            return jsonify({"error": "Invalid cursor"}), 400
+
+    response = supabase.rpc("search_posts", params).execute()
+    posts = response.data or []
+
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(repr(posts[-1]["rank"]), posts[-1]["id"])
+
+    mark_liked_by_me(posts)
+    return jsonify({"data": posts, "next_cursor": next_cursor}), 200
+
+
+def mark_liked_by_me(posts):
+    """
+    Set liked_by_me on each post with one index lookup on post_likes
+    (user_id, post_id) for the whole page.
+    """
+    user = session.get("user")
+    liked = set()
+
+    if user and posts:
+        res = (
+            supabase.table("post_likes")
+            .select("post_id")
+            .eq("user_id", user["id"])
+            .in_("post_id", [p["id"] for p in posts])
+            .execute()
+        )
+        liked = {row["post_id"] for row in res.data or []}
+
+    for p in posts:
+        p["liked_by_me"] = p["id"] in liked
 
 
 @posts_bp.route("/<post_id>", methods=["GET"])
+@conditional(lambda post_id: [f"post:{post_id}", "names"])
 def get_post(post_id):
     """
     Fetch a single post by ID.
     """
-    response = supabase.table("Posts").select(
-        "id, content, like_count, comments, created_at, title, liked_by, user_profile!Posts_user_id_fkey(username)"   
-    ).eq("id", post_id).execute()
-    if not response.data:
+    post = loader("Posts", columns=FEED_COLUMNS).load(post_id)
+    if not post:
         return jsonify({"error": "Post not found"}), 404
-    return jsonify(response.data[0]), 200
+
+    mark_liked_by_me([post])
+    return jsonify(post), 200
 
 
 # ----------------------------
 # LIKE A POST
 # ----------------------------
 @posts_bp.route("/<post_id>/like", methods=["POST"])
+@rate_limited
 def like_post(post_id):
     """
-    Adds the current user's ID to liked_by and increments like_count.
+    Record a (post, user) like edge and bump like_count in one atomic call.
+    Idempotent - liking twice leaves the count unchanged.
     """
     if "user" not in session:
         return jsonify({"error": "Unauthorized"}), 401
 
     user_id = session["user"]["id"]
 
-    post = supabase.table("Posts").select("like_count, liked_by").eq("id", post_id).single().execute()
-    if not post.data:
+    res = supabase.rpc("like_post", {"p_post_id": post_id, "p_user_id": user_id}).execute()
+    if res.data is None:
         return jsonify({"error": "Post not found"}), 404
 
-    liked_by = post.data.get("liked_by") or []
-    like_count = post.data.get("like_count") or 0
-
-    if user_id not in liked_by:
-        liked_by.append(user_id)
-        like_count += 1
-
-        supabase.table("Posts").update({
-            "like_count": like_count,
-            "liked_by": liked_by
-        }).eq("id", post_id).execute()
-
-    return jsonify({"like_count": like_count, "liked_by": liked_by}), 200
+    touch("posts", f"post:{post_id}")
+    return jsonify({"like_count": res.data, "liked_by_me": True}), 200
 
 # ----------------------------
 # UNLIKE A POST
@@ -106,38 +222,30 @@ def like_post(post_id):
 @posts_bp.route("/<post_id>/unlike", methods=["PUT"])
 def unlike_post(post_id):
     """
-    Removes the current user's ID from liked_by and decrements like_count.
+    Remove the current user's like edge and decrement like_count atomically.
+    Idempotent - unliking a post you haven't liked is a no-op.
     """
     if "user" not in session:
         return jsonify({"error": "Unauthorized"}), 401
 
     user_id = session["user"]["id"]
 
-    post = supabase.table("Posts").select("like_count, liked_by").eq("id", post_id).single().execute()
-    if not post.data:
+    res = supabase.rpc("unlike_post", {"p_post_id": post_id, "p_user_id": user_id}).execute()
+    if res.data is None:
         return jsonify({"error": "Post not found"}), 404
 
-    liked_by = post.data.get("liked_by") or []
-    like_count = post.data.get("like_count") or 0
-
-    if user_id in liked_by:
-        liked_by.remove(user_id)
-        like_count = max(0, like_count - 1)
-
-        supabase.table("Posts").update({
-            "like_count": like_count,
-            "liked_by": liked_by
-        }).eq("id", post_id).execute()
-
-    return jsonify({"like_count": like_count, "liked_by": liked_by}), 200
+    touch("posts", f"post:{post_id}")
+    return jsonify({"like_count": res.data, "liked_by_me": False}), 200
 
 # ----------------------------
 # ADD COMMENT
 # ----------------------------
 @posts_bp.route("/<post_id>/comment", methods=["POST"])
+@rate_limited
 def comment_post(post_id):
     """
     Add a comment to a post.
+    - Single append into post_comments; comment_count is bumped by a trigger.
     """
     if "user" not in session:
         return jsonify({"error": "User not logged in"}), 401
@@ -151,40 +259,28 @@ def comment_post(post_id):
     # Get current user info
     user = session["user"]
 
-    # Fetch the current post
-    post_response = supabase.table("Posts").select("comments").eq("id", post_id).execute()
-
-    if not post_response.data or len(post_response.data) == 0:
-        return jsonify({"error": "Post not found"}), 404
-
-    # Get the existing comments (if any)
-    existing_comments = post_response.data[0].get("comments") or []
-
-    # new comment
     new_comment = {
-    "username": user.get("username", "unknown"),
-    "text": comment_text,
-    "created_at": datetime.now(timezone.utc).isoformat(),
-}
-
-
-    # Append the new comment to the list
-    updated_comments = existing_comments + [new_comment]
-
-    # Update Supabase
-    update_response = (
-        supabase.table("Posts")
-        .update({"comments": updated_comments})
-        .eq("id", post_id)
-        .execute()
-    )
-
-    if update_response.data is None:
-        return jsonify({"error": "Failed to update comments"}), 500
+        "post_id": post_id,
+        "user_id": user["id"],
+        "username": user.get("username", "unknown"),
+        "text": comment_text,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
 
-    return jsonify({"message": "Comment added successfully", "comment": new_comment}), 200
+    try:
+        response = supabase.table("post_comments").insert(new_comment).execute()
+    except APIError as e:
+        # foreign key violation -> the post doesn't exist
+        if e.code == "23503":
+            return jsonify({"error": "Post not found"}), 404
+        raise
 
+    if not response.data:
+        return jsonify({"error": "Failed to add comment"}), 500
 
+    # comment_count changed
+    touch("posts", f"post:{post_id}")
+    return jsonify({"message": "Comment added successfully", "comment": response.data[0]}), 200
 
 
 # ----------------------------
@@ -192,54 +288,72 @@ def comment_post(post_id):
 # ----------------------------
 @posts_bp.route("/<post_id>/comments", methods=["GET"])
 def get_comments(post_id):
-    post = supabase.table("Posts").select("comments").eq("id", post_id).single().execute()
-    if not post.data:
-        return jsonify({"error": "Post not found"}), 404
-    return jsonify(post.data.get("comments", [])), 200
+    """
+    Fetch one page of a post's comments, oldest first.
+    - ?limit= page size, ?cursor= from the previous page.
+    Returns {"data": [...], "next_cursor": str | None}.
+    """
+    limit = parse_limit(request.args.get("limit"))
+
+    query = (
+        supabase.table("post_comments")
+        .select("id, user_id, username, text, created_at")
+        .eq("post_id", post_id)
+    )
+    try:
+        query = apply_keyset(query, request.args.get("cursor"), desc=False)
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    response = query.limit(limit + 1).execute()
+    comments, next_cursor = page(response.data, limit)
+
+    # an empty first page may just mean the post doesn't exist
+    if not comments and not request.args.get("cursor"):
+        if not loader("Posts", columns="id").load(post_id):
+            return jsonify({"error": "Post not found"}), 404
+
+    return jsonify({"data": comments, "next_cursor": next_cursor}), 200
 
 
 # ----------------------------
 # COMMENT DELETION
 # ----------------------------
-@posts_bp.route("/<post_id>/comment/<int:comment_index>", methods=["DELETE"])
-def delete_comment(post_id, comment_index):
+@posts_bp.route("/<post_id>/comments/<int:comment_id>", methods=["DELETE"])
+def delete_comment(post_id, comment_id):
     """
-    Delete a specific comment from a post.
+    Delete a specific comment from a post by its id.
     Only the comment's author can delete it.
     """
     if "user" not in session:
         return jsonify({"error": "Unauthorized"}), 401
 
     user = session["user"]
-    data = request.get_json()
-
-    comment = {
-        "username": user["username"],
-        "text": data.get("text"),
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
-
-    # Fetch the post's comments
-    post = supabase.table("Posts").select("comments").eq("id", post_id).single().execute()
-    if not post.data:
-        return jsonify({"error": "Post not found"}), 404
-
-    comments = post.data.get("comments", [])
-    if comment_index < 0 or comment_index >= len(comments):
-        return jsonify({"error": "Invalid comment index"}), 400
 
-    # Only allow deletion if the current user is the comment author
-    if comments[comment_index]["username"] != user["username"]:
-        return jsonify({"error": "Unauthorized"}), 403
-
-    # Remove the comment
-    comments.pop(comment_index)
-
-    # Update Supabase
-    supabase.table("Posts").update({"comments": comments}).eq("id", post_id).execute()
+    response = (
+        supabase.table("post_comments")
+        .delete()
+        .eq("id", comment_id)
+        .eq("post_id", post_id)
+        .eq("user_id", user["id"])
+        .execute()
+    )
+    if response.data:
+        touch("posts", f"post:{post_id}")
+        return jsonify({"message": "Comment deleted"}), 200
 
-    return jsonify({"message": "Comment deleted"}), 200
+    # nothing deleted - either it doesn't exist or it isn't ours
+    exists = (
+        supabase.table("post_comments")
+        .select("id")
+        .eq("id", comment_id)
+        .eq("post_id", post_id)
+        .execute()
+    )
+    if not exists.data:
+        return jsonify({"error": "Comment not found"}), 404
 
+    return jsonify({"error": "Unauthorized"}), 403
 
 
 # ----------------------------
@@ -258,12 +372,12 @@ def update_post(post_id):
     data = request.get_json()
 
     # Fetch post owner
-    post = supabase.table("Posts").select("user_id").eq("id", post_id).single().execute()
-    if not post.data:
+    post = loader("Posts", columns="user_id").load(post_id)
+    if not post:
         return jsonify({"error": "Post not found"}), 404
     
     #using user_id for stricter check as usernme can be changed
-    if post.data["user_id"] != user["id"]: 
+    if post["user_id"] != user["id"]: 
         return jsonify({"error": "Unauthorized"}), 403
 
     # Only allow updating content
@@ -272,6 +386,8 @@ def update_post(post_id):
         updates["content"] = data["content"]
 
     response = supabase.table("Posts").update(updates).eq("id", post_id).execute()
+    forget("Posts", post_id)
+    touch("posts", f"post:{post_id}")
     return jsonify(response.data[0]), 200
 
 
@@ -291,14 +407,20 @@ def delete_post(post_id):
 
     # Fetch post owner
     #using user_id for stricter check as usernme can be changed
-    post = supabase.table("Posts").select("user_id").eq("id", post_id).single().execute()
-    if not post.data:
+    post = loader("Posts", columns="user_id").load(post_id)
+    if not post:
         return jsonify({"error": "Post not found"}), 404
 
-    if post.data["user_id"] != user["id"]:
+    if post["user_id"] != user["id"]:
         return jsonify({"error": "Unauthorized"}), 403
 
-    supabase.table("Posts").delete().eq("id", post_id).execute()
+    concurrently(
+        supabase.table("Posts").delete().eq("id", post_id).execute,
+        lambda: timeline.safely(timeline.retract, post_id),
+    )
+    forget("Posts", post_id)
+    touch("posts", f"post:{post_id}")
+    forget_counts()
     return jsonify({"message": "Post deleted successfully"}), 200
 
 # ----------------------------
@@ -308,24 +430,15 @@ def delete_post(post_id):
 def get_user_posts(username):
     """
     Fetch all posts created by a given user.
-    Joins against user_profile to filter by username.
+    Username is resolved through the shared (cached) user id lookup.
     """
-    profile = (
-        supabase.table("user_profile")
-        .select("id")
-        .eq("username", username)
-        .single()
-        .execute()
-    )
-
-    if not profile.data:
+    user_id = resolve_user_id(username)
+    if not user_id:
         return jsonify([]), 200
 
-    user_id = profile.data["id"]
-
     response = (
         supabase.table("Posts")
-        .select("id, content, like_count, comments, created_at, title, user_id")
+        .select("id, content, like_count, comment_count, created_at, title, user_id")
         .eq("user_id", user_id)
         .order("created_at", desc=True)
         .execute()
@@ -1,5 +1,15 @@
 from flask import Blueprint, jsonify, request, session
 from app.supabase_client import supabase
+from app import timeline
+from app.users import forget_user_id, forget_username, resolve_user_id
+from app.admins import forget_admin
+from app.listing_counts import forget_counts
+from app.pagination import InvalidCursor, apply_keyset, page, parse_limit
+from app.loaders import forget, loader
+from app.fanout import concurrently
+from app import records, user_search, volume
+from app.conditional import conditional, touch, user_scopes
+from datetime import date
 
 # Blueprint for user routes
 user_bp = Blueprint("user", __name__)
@@ -8,24 +18,68 @@ user_bp = Blueprint("user", __name__)
 # CRUD Routes
 # ----------------------
 
+# columns in user listings / search results - no bios or picture data
+USER_LIST_COLUMNS = "id, username, created_at"
+
+
 @user_bp.route("/users", methods=["GET"])
 def get_users():
     """
-    Fetch All Users
+    List Users
 
-    Retrieves all user profiles from the 'user_profile' table.
-    Returns JSON response with list of users or error message.
+    One page of user profiles, newest first.
+    - ?limit= (default 50, max 200) / ?cursor= keyset pagination
+    Returns {"users": [...], "next_cursor": str | None}.
+    Use /user/search for finding a user by name.
     """
+    limit = parse_limit(request.args.get("limit"), default=50, maximum=200)
+
+    query = supabase.table("user_profile").select(USER_LIST_COLUMNS)
+    try:
+        query = apply_keyset(query, request.args.get("cursor"))
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
 
     try:
-        response = supabase.table("user_profile").select("*").execute()
-        return jsonify({"users": response.data})
+        response = query.limit(limit + 1).execute()
+        users, next_cursor = page(response.data, limit)
+        return jsonify({"users": users, "next_cursor": next_cursor})
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@user_bp.route("/search", methods=["GET"])
+def search_users():
+    """
+    Username Autocomplete
+
+    Usernames starting with ?q= (case-insensitive), served from the
+    in-memory prefix index in app/user_search.py.
+    - ?limit= top-K results (default 10, max 25)
+    Returns {"users": [{"username"}, ...]}.
+    """
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"users": []}), 200
+    limit = parse_limit(request.args.get("limit"), default=10, maximum=25)
+
+    try:
+        names = user_search.search(q, limit)
+        return jsonify({"users": [{"username": n} for n in names]}), 200
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def profile_scopes(username):
+    # unknown users skip validation and get their 404 from the view
+    user_id = resolve_user_id(username)
+    return [f"user:{user_id}"] if user_id else None
+
+
 @user_bp.route("/users/<string:username>", methods=["GET"])
+@conditional(profile_scopes)
 def get_user(username):
     """
     Fetch User by Username
@@ -35,10 +89,10 @@ def get_user(username):
     """
 
     try:
-        response = supabase.table("user_profile").select("*").eq("username", username).execute()
+        profile = loader("user_profile", key="username").load(username)
 
-        if response.data:
-            return jsonify({"user": response.data[0]})
+        if profile:
+            return jsonify({"user": profile})
         
         return jsonify({"error": "User not found"}), 404
     
@@ -51,18 +105,27 @@ def get_user_prs(username):
     """
     Fetch User PRs (Personal Records)
 
-    Retrieves bench_pr, squat_pr, and deadlift_pr for a user.
+    Retrieves bench_pr, squat_pr, and deadlift_pr for a user, plus the
+    automatically tracked records for every exercise they have logged.
     Returns JSON response with PR data.
     """
 
     try:
-        response = supabase.table("user_profile").select("bench_pr, squat_pr, deadlift_pr").eq("username", username).single().execute()
+        prs = loader("user_profile", key="username", columns="id, bench_pr, squat_pr, deadlift_pr").load(username)
 
-        if response.data:
+        if prs:
+            tracked = records.load_bests(prs["id"])
             return jsonify({
-                "bench_pr": response.data.get("bench_pr", 0),
-                "squat_pr": response.data.get("squat_pr", 0),
-                "deadlift_pr": response.data.get("deadlift_pr", 0)
+                "bench_pr": prs.get("bench_pr", 0),
+                "squat_pr": prs.get("squat_pr", 0),
+                "deadlift_pr": prs.get("deadlift_pr", 0),
+                "records": sorted(
+                    (
+                        {k: r[k] for k in ("display_name", "weight", "reps", "estimated_1rm", "achieved_at")}
+                        for r in tracked.values()
+                    ),
+                    key=lambda r: r["display_name"].lower(),
+                ),
             }), 200
         
         return jsonify({"error": "User not found"}), 404
@@ -107,8 +170,25 @@ def update_user(username):
         
         if updates:
             updates["updated_at"] = "now()"
+
+        old_username = None
+        if "username" in updates:
+            # the session may predate a rename made elsewhere; the row is current
+            res = supabase.table("user_profile").select("username").eq("id", user["id"]).limit(1).execute()
+            old_username = res.data[0]["username"] if res.data else user.get("username")
         
         response = supabase.table("user_profile").update(updates).eq("id", user["id"]).execute()
+        forget("user_profile", user["id"])
+
+        if "username" in updates:
+            # old name now points nowhere, new name may be cached as a miss
+            forget_username(old_username, updates["username"])
+            user_search.rename(old_username, updates["username"])
+            # feeds embed the author's username
+            touch("names")
+            session["user"]["username"] = updates["username"]
+            session.modified = True
+        touch(f"user:{user['id']}")
 
         return jsonify({"updated": response.data}), 200
     
@@ -131,7 +211,18 @@ def delete_user(username):
     user = session["user"]
 
     try:
+        # post_likes cascade with the profile without touching like_count;
+        # take the likes back first so the counters stay exact
+        supabase.rpc("purge_post_likes", {"p_user_ids": [user["id"]]}).execute()
         response = supabase.table("user_profile").delete().eq("id", user["id"]).execute()
+        # the deleted row has the current name even if the session's is stale
+        deleted_username = response.data[0].get("username") if response.data else user.get("username")
+        forget_user_id(user["id"])
+        forget_username(deleted_username)
+        forget_admin(user["id"])
+        user_search.remove(deleted_username)
+        touch(*user_scopes(user["id"]))
+        forget_counts()
         session.clear()
 
         return jsonify({"deleted": response.count}), 200
@@ -163,12 +254,10 @@ def follow_user(username):
 
     try:
         # find the user to follow by username
-        target_res = supabase.table("user_profile").select("id").eq("username", username).single().execute()
-        if not target_res.data:
+        followed_id = resolve_user_id(username)
+        if not followed_id:
             return jsonify({"error": "User not found"}), 404
 
-        followed_id = target_res.data["id"]
-
         # prevent user from following themselves
         if followed_id == follower_id:
             return jsonify({"error": "Cannot follow yourself"}), 400
@@ -179,11 +268,13 @@ def follow_user(username):
         if exists_res.data:
             return jsonify({"message": "Already following"}), 200
 
-        # insert the new follow record (using correct column names)
+        # insert the new follow record (using correct column names); the
+        # timeline is only backfilled once the edge is actually stored
         supabase.table("Followers").insert({
             "user_id": follower_id,
             "followed_user_id": followed_id
         }).execute()
+        timeline.safely(timeline.backfill, follower_id, followed_id)
 
         return jsonify({"message": f"Started following {username}"}), 201
     
@@ -209,14 +300,16 @@ def unfollow_user(username):
 
     try:
         # find the user to unfollow by username
-        target_res = supabase.table("user_profile").select("id").eq("username", username).single().execute()
-        if not target_res.data:
+        followed_id = resolve_user_id(username)
+        if not followed_id:
             return jsonify({"error": "User not found"}), 404
 
-        followed_id = target_res.data["id"]
-
-        # remove the following status (using correct column names)
-        delete_res = supabase.table("Followers").delete().eq("user_id", follower_id).eq("followed_user_id", followed_id).execute()
+        # remove the following status (using correct column names); pruning
+        # runs alongside and is a no-op if we weren't following
+        delete_res, _ = concurrently(
+            supabase.table("Followers").delete().eq("user_id", follower_id).eq("followed_user_id", followed_id).execute,
+            lambda: timeline.safely(timeline.prune, follower_id, followed_id),
+        )
 
         if not delete_res.data:
             # not following that user in the first place
@@ -233,80 +326,110 @@ def get_followers(username):
     """
     Get Followers List
 
-    Retrieves a list of usernames who follow the specified user.
-    - Finds the user ID by username.
-    - Queries the Followers table for all user_ids of this user.
-    - Fetches the usernames of those followers from user_profile table.
-    Returns the list of follower usernames.
+    Retrieves one page of usernames who follow the specified user.
+    - Resolves the username through the shared id cache.
+    - One joined query over Followers -> user_profile, keyset paginated,
+      with the exact total.
+    Returns {"followers": [...], "next_cursor": str | None, "total": int}.
     """
-    try:
-        # find the user ID by username
-        target_res = supabase.table("user_profile").select("id").eq("username", username).single().execute()
-        if not target_res.data:
-            return jsonify({"error": "User not found"}), 404
+    return edge_list(username, "Followers", "followed_user_id", "user_profile!Followers_user_id_fkey", "followers")
 
-        user_id = target_res.data["id"]
 
-        # get follower IDs who follow this user (using correct column names)
-        # People who follow this user have this user's ID in followed_user_id column
-        followers_res = supabase.table("Followers").select("user_id").eq("followed_user_id", user_id).execute()
+@user_bp.route("/<string:username>/following", methods=["GET"])
+def get_following(username):
+    """
+    Get Following List
 
-        follower_ids = [f["user_id"] for f in followers_res.data]
+    Retrieves one page of usernames the specified user is following.
+    - Resolves the username through the shared id cache.
+    - One joined query over Followers -> user_profile, keyset paginated,
+      with the exact total.
+    Returns {"following": [...], "next_cursor": str | None, "total": int}.
+    """
+    return edge_list(username, "Followers", "user_id", "user_profile!Followers_followed_user_id_fkey", "following")
 
-        if not follower_ids:
-            # no followers found
-            return jsonify({"followers": []})
 
-        # get usernames of all followers
-        users_res = supabase.table("user_profile").select("username").in_("id", follower_ids).execute()
+@user_bp.route("/<string:username>/counts", methods=["GET"])
+def get_social_counts(username):
+    """
+    Get Follower / Following / Likes Counts
+
+    Counts-only lookup for profile headers - no rows are transferred.
+    Returns {"followers": int, "following": int, "likes": int,
+    "is_following": bool or null} - is_following says whether the
+    logged-in viewer follows this user (null when logged out / own profile).
+    """
+    try:
+        user_id = resolve_user_id(username)
+        if not user_id:
+            return jsonify({"error": "User not found"}), 404
 
-        followers = [u["username"] for u in users_res.data]
+        viewer_id = (session.get("user") or {}).get("id")
+        if viewer_id == user_id:
+            viewer_id = None
+
+        def count(table, column):
+            return supabase.table(table).select("*", count="exact", head=True).eq(column, user_id).execute
+
+        calls = [
+            count("Followers", "followed_user_id"),
+            count("Followers", "user_id"),
+            count("user_likes", "liked_user_id"),
+        ]
+        if viewer_id:
+            calls.append(
+                supabase.table("Followers").select("id", count="exact", head=True)
+                .eq("user_id", viewer_id).eq("followed_user_id", user_id).execute
+            )
+        results = concurrently(*calls)
+        followers, following, likes = results[:3]
+
+        return jsonify({
+            "followers": followers.count or 0,
+            "following": following.count or 0,
+            "likes": likes.count or 0,
+            "is_following": bool(results[3].count) if viewer_id else None,
+        }), 200
 
-        return jsonify({"followers": followers})
-    
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@user_bp.route("/<string:username>/following", methods=["GET"])
-def get_following(username):
+def edge_list(username, table, column, embed, key):
     """
-    Get Following List
-
-    Retrieves a list of usernames the specified user is following.
-    - Finds the user ID by username.
-    - Queries the Followers table for all followed_user_ids that this user follows.
-    - Fetches the usernames of those followed users from user_profile table.
-    Returns the list of followed usernames.
+    Page through one side of an edge table (Followers / user_likes) where
+    `column` matches the user, embedding the other side's username.
+    ?limit= (default 50, max 200) and ?cursor= from the previous page.
     """
     try:
-        # find the user ID by username
-        target_res = supabase.table("user_profile").select("id").eq("username", username).single().execute()
-        if not target_res.data:
+        user_id = resolve_user_id(username)
+        if not user_id:
             return jsonify({"error": "User not found"}), 404
 
-        user_id = target_res.data["id"]
-
-        # get IDs of users that this user is following (using correct column names)
-        # Users this person follows are in the followed_user_id column where user_id is this user
-        following_res = supabase.table("Followers").select("followed_user_id").eq("user_id", user_id).execute()
-
-        followed_ids = [f["followed_user_id"] for f in following_res.data]
+        limit = parse_limit(request.args.get("limit"), default=50, maximum=200)
 
-        if not followed_ids:
-            # not following anyone
-            return jsonify({"following": []})
+        query = (
+            supabase.table(table)
+            .select(f"id, created_at, profile:{embed}(username)", count="exact")
+            .eq(column, user_id)
+        )
+        query = apply_keyset(query, request.args.get("cursor"))
 
-        # get usernames of all followed users
-        users_res = supabase.table("user_profile").select("username").in_("id", followed_ids).execute()
+        res = query.limit(limit + 1).execute()
+        rows, next_cursor = page(res.data, limit)
 
-        following = [u["username"] for u in users_res.data]
+        return jsonify({
+            key: [r["profile"]["username"] for r in rows if r.get("profile")],
+            "next_cursor": next_cursor,
+            "total": res.count,
+        }), 200
 
-        return jsonify({"following": following})
-    
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
 # ---------------------
 # Likes Features
 # ---------------------
@@ -331,12 +454,10 @@ def like_user(username):
 
     try:
         # get the user to be liked
-        target_res = supabase.table("user_profile").select("id").eq("username", username).single().execute()
-        if not target_res.data:
+        liked_user_id = resolve_user_id(username)
+        if not liked_user_id:
             return jsonify({"error": "User not found"}), 404
 
-        liked_user_id = target_res.data["id"]
-
         if liked_user_id == user_id:
             return jsonify({"error": "Cannot like yourself"}), 400
 
@@ -376,12 +497,10 @@ def unlike_user(username):
 
     try:
         # get the user to be unliked
-        target_res = supabase.table("user_profile").select("id").eq("username", username).single().execute()
-        if not target_res.data:
+        liked_user_id = resolve_user_id(username)
+        if not liked_user_id:
             return jsonify({"error": "User not found"}), 404
 
-        liked_user_id = target_res.data["id"]
-
         # delete the like
         delete_res = supabase.table("user_likes").delete().eq("user_id", user_id).eq("liked_user_id", liked_user_id).execute()
 
@@ -399,66 +518,48 @@ def get_likes(username):
     """
     Get Likes List
 
-    Retrieves a list of usernames who liked the specified user.
-    - Finds the user ID by username.
-    - Queries the user_likes table for all user_ids who liked this user.
-    - Fetches the usernames of those users from user_profile table.
-    Returns the list of usernames who liked the user.
+    Retrieves one page of usernames who liked the specified user.
+    - Resolves the username through the shared id cache.
+    - One joined query over user_likes -> user_profile, keyset paginated,
+      with the exact total.
+    Returns {"likes": [...], "next_cursor": str | None, "total": int}.
     """
-    try:
-        # get user id
-        target_res = supabase.table("user_profile").select("id").eq("username", username).single().execute()
-        if not target_res.data:
-            return jsonify({"error": "User not found"}), 404
-
-        liked_user_id = target_res.data["id"]
+    return edge_list(username, "user_likes", "liked_user_id", "user_profile!user_likes_user_id_fkey", "likes")
 
-        # find all users who liked this user
-        likes_res = supabase.table("user_likes").select("user_id").eq("liked_user_id", liked_user_id).execute()
-
-        liker_ids = [like["user_id"] for like in likes_res.data]
-
-        if not liker_ids:
-            return jsonify({"likes": []})
-
-        # get usernames of those who liked
-        users_res = supabase.table("user_profile").select("username").in_("id", liker_ids).execute()
-
-        likers = [u["username"] for u in users_res.data]
-
-        return jsonify({"likes": likers})
-    
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
 
 @user_bp.route("/volume-history", methods=["GET"])
 def get_volume_history():
+    """
+    Get Volume History
+
+    Reads the precomputed volume rollups for the logged-in user.
+    - ?bucket= day (default) | week | month
+    - ?from= / ?to= ISO dates (inclusive), both optional
+    Returns [{"date", "volume", "sessions"}, ...] oldest first, capped to
+    the most recent volume.MAX_POINTS buckets.
+    """
     if "user" not in session:
         return jsonify({"error": "Unauthorized"}), 401
 
     user_id = session["user"]["id"]
 
+    bucket = request.args.get("bucket", "day")
+    if bucket not in volume.BUCKETS:
+        return jsonify({"error": f"bucket must be one of {', '.join(volume.BUCKETS)}"}), 400
+
     try:
-        response = supabase.table("user_profile") \
-            .select("volume_history") \
-            .eq("id", user_id) \
-            .single() \
-            .execute()
-
-        if response.data is None:
-            return jsonify({"error": "No profile found"}), 404
-
-        volume_history = response.data.get("volume_history", [])
-
-        # Ensure JSON serializable datetime
-        safe_history = []
-        for item in volume_history:
-            safe_history.append({
-                "date": str(item["date"]),
-                "volume": item["volume"]
-            })
-
-        return jsonify(safe_history), 200
+        start = date.fromisoformat(request.args["from"]) if "from" in request.args else None
+        end = date.fromisoformat(request.args["to"]) if "to" in request.args else None
+    except ValueError:
+        return jsonify({"error": "from / to must be ISO dates (YYYY-MM-DD)"}), 400
+
+    try:
+        points = volume.history(user_id, bucket, start, end)
+
+        return jsonify([
+            {"date": p["period_start"], "volume": p["volume"], "sessions": p["sessions"]}
+            for p in points
+        ]), 200
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify, session
 from app.supabase_client import supabase
+from app.loaders import loader
+from app.conditional import conditional, touch
+from app.listing_counts import forget_counts
 from datetime import datetime, timezone
 
 workout_plans_bp = Blueprint("workout_plans", __name__)
@@ -32,13 +35,21 @@ def create_workout_plan():
     if not result.data:
         return jsonify({"error": "Failed to create workout plan"}), 500
 
+    touch(f"plans:{user['id']}")
+    forget_counts()
     return jsonify(result.data[0]), 201
 
 
 # --------------------------------------------------------
 # GET ALL WORKOUT PLANS
 # --------------------------------------------------------
+def plan_scopes(*args, **kwargs):
+    user = session.get("user")
+    return [f"plans:{user['id']}"] if user else None
+
+
 @workout_plans_bp.route("", methods=["GET"])
+@conditional(plan_scopes)
 def get_all_plans():
     """Return all plans for the logged-in user."""
     if "user" not in session:
@@ -60,25 +71,20 @@ def get_all_plans():
 # GET SINGLE WORKOUT PLAN
 # --------------------------------------------------------
 @workout_plans_bp.route("/<int:plan_id>", methods=["GET"])
+@conditional(plan_scopes)
 def get_workout_plan(plan_id):
     """Get one workout plan by numeric id."""
     if "user" not in session:
         return jsonify({"error": "Unauthorized"}), 401
 
     user = session["user"]
-    result = (
-        supabase.table("workout_plans")
-        .select("*")
-        .eq("user_id", user["id"])
-        .eq("id", plan_id)
-        .single()
-        .execute()
-    )
+    plan = loader("workout_plans").load(plan_id)
 
-    if not result.data:
+    # other users' plans are reported as missing, same as before
+    if not plan or plan["user_id"] != user["id"]:
         return jsonify({"error": "Workout plan not found"}), 404
 
-    return jsonify(result.data), 200
+    return jsonify(plan), 200
 
 
 # --------------------------------------------------------
@@ -112,6 +118,7 @@ def update_workout_plan(plan_id):
     if not result.data:
         return jsonify({"error": "Workout plan not found"}), 404
 
+    touch(f"plans:{user['id']}")
     return jsonify(result.data[0]), 200
 
 
@@ -137,4 +144,6 @@ def delete_workout_plan(plan_id):
     if not result.data:
         return jsonify({"error": "Workout plan not found"}), 404
 
+    touch(f"plans:{user['id']}")
+    forget_counts()
     return jsonify({"message": "Workout plan deleted"}), 200
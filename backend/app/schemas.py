@@ -40,3 +40,8 @@ class WorkoutCreate(BaseModel):
     total_volume: Optional[float] = 0.0
     workoutPlan: WorkoutPlan
 
+
+
+class SessionImport(WorkoutCreate):
+    # historical sessions keep their original date; defaults to now
+    created_at: Optional[datetime] = None
@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+import zlib
+from app.pagination import apply_keyset, encode_cursor
+from app.session_import import CSV_COLUMNS
+from app.supabase_client import slow_calls, supabase
+
+#---------------------------------------------
+# Streaming workout-session export (NDJSON / CSV)
+#
+# Sessions are paged out of workout_session with keyset pagination and
+# written to the response as they arrive, so memory stays at one page
+# and the first bytes go out after the first query. The CSV layout is
+# the one POST /sessions/import reads, so exports round-trip.
+#---------------------------------------------
+
+EXPORT_COLUMNS = "id, created_at, notes, total_volume, workout_plan"
+PAGE_SIZE = 500
+
+# flush compressed output roughly this often rather than per row
+GZIP_CHUNK = 64 * 1024
+
+
+def iter_sessions(user_id, page_size=PAGE_SIZE):
+    """Yield the user's sessions oldest first, one keyset page at a time."""
+    cursor = None
+    while True:
+        query = supabase.table("workout_session").select(EXPORT_COLUMNS).eq("user_id", user_id)
+        with slow_calls():
+            rows = apply_keyset(query, cursor, desc=False).limit(page_size).execute().data or []
+        yield from rows
+        if len(rows) < page_size:
+            return
+        cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+
+def ndjson_lines(sessions):
+    for s in sessions:
+        yield json.dumps({
+            "created_at": s["created_at"],
+            "notes": s.get("notes"),
+            "total_volume": s.get("total_volume"),
+            "workoutPlan": s.get("workout_plan"),
+        }, separators=(",", ":")) + "\n"
+
+
+def csv_lines(sessions):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_COLUMNS)
+
+    for s in sessions:
+        plan = s.get("workout_plan") or {}
+        for ex in plan.get("exercises", []):
+            for st in ex.get("sets", []):
+                writer.writerow((
+                    s["created_at"], plan.get("name", ""), s.get("notes") or "",
+                    ex.get("name", ""), ex.get("type", ""), st.get("weight"), st.get("reps"),
+                ))
+        # one chunk per session keeps the buffer small
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def encode(chunks, gzip=False):
+    """utf-8 encode text chunks, optionally as one streaming gzip member."""
+    if not gzip:
+        for chunk in chunks:
+            yield chunk.encode()
+        return
+
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    pending = 0
+    for chunk in chunks:
+        data = chunk.encode()
+        pending += len(data)
+        out = compressor.compress(data)
+        if pending >= GZIP_CHUNK:
+            out += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def stream(user_id, fmt, gzip=False):
+    """Response body generator for one user's export."""
+    sessions = iter_sessions(user_id)
+    lines = csv_lines(sessions) if fmt == "csv" else ndjson_lines(sessions)
+    return encode(lines, gzip)
@@ -0,0 +1,163 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime, timezone
+from pydantic import ValidationError
+from app.schemas import SessionImport
+from app.supabase_client import supabase
+from app import exercise_index, records, volume
+
+#---------------------------------------------
+# Bulk workout-session import (NDJSON / CSV)
+#
+# The request body is read as a stream and validated one session at a
+# time with the same schemas as POST /sessions. Valid sessions are
+# inserted in batches, so memory is bounded by the batch size rather
+# than the upload, and volume rollups, the exercise history index and
+# personal records are updated per batch / per import, not per session.
+#
+# NDJSON: one {"notes", "workoutPlan", "created_at"} object per line.
+# CSV:    one set per row; consecutive rows with the same date + workout
+#         form one session.
+#           date,workout,notes,exercise,type,weight,reps
+#---------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+CSV_COLUMNS = ("date", "workout", "notes", "exercise", "type", "weight", "reps")
+
+# per-row errors echoed back; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+def read_ndjson(text):
+    """Yield (line, obj) per non-blank line; obj is an Exception if unparsable."""
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+
+
+def read_csv(text):
+    """Yield (line, obj) per session, grouping consecutive set rows."""
+    reader = csv.DictReader(text)
+    missing = set(CSV_COLUMNS) - {"notes"} - set(reader.fieldnames or [])
+    if missing:
+        yield 1, ValueError(f"missing columns: {', '.join(sorted(missing))}")
+        return
+
+    current, key, start = None, None, None
+    for row in reader:
+        row_key = (row["date"], row["workout"])
+        if row_key != key:
+            if current:
+                yield start, current
+            key, start = row_key, reader.line_num
+            current = {
+                "created_at": row["date"] or None,
+                "notes": row.get("notes") or None,
+                "workoutPlan": {"name": row["workout"], "description": None, "exercises": []},
+            }
+
+        exercises = current["workoutPlan"]["exercises"]
+        if not exercises or exercises[-1]["name"] != row["exercise"]:
+            exercises.append({"name": row["exercise"], "type": row["type"], "sets": []})
+        exercises[-1]["sets"].append({"weight": row["weight"], "reps": row["reps"]})
+
+    if current:
+        yield start, current
+
+
+def to_record(user_id, data, now):
+    created_at = data.created_at or now
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    # store UTC so the "YYYY-MM-DD" prefix volume.record_many buckets on
+    # is the same UTC day the single-session path uses
+    created_at = created_at.astimezone(timezone.utc)
+
+    return {
+        "user_id": user_id,
+        "notes": data.notes,
+        "workout_plan": data.workoutPlan.model_dump(),
+        "total_volume": volume.session_volume(data.workoutPlan),
+        "created_at": created_at.isoformat(),
+    }
+
+
+def run(user_id, stream, fmt, batch_size, max_rows):
+    """
+    Import sessions from a binary stream. Returns a summary dict:
+    {"imported", "failed", "errors": [{"line", "errors"}], "truncated",
+    "new_records"}. Reading stops after max_rows sessions (truncated=True).
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    rows = read_csv(text) if fmt == "csv" else read_ndjson(text)
+    now = datetime.now(timezone.utc)
+
+    summary = {"imported": 0, "failed": 0, "errors": [], "truncated": False}
+    bests = {}
+    batch, lines = [], []
+
+    def fail(line_no, errors):
+        summary["failed"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+            summary["errors"].append({"line": line_no, "errors": errors})
+
+    def flush():
+        if not batch:
+            return
+        try:
+            inserted = supabase.table("workout_session").insert(batch).execute().data or []
+        except Exception as e:
+            logger.error(f"Session import batch failed for {user_id}: {e}")
+            for line_no in lines:
+                fail(line_no, [{"msg": "insert failed"}])
+        else:
+            summary["imported"] += len(inserted)
+            for row in inserted:
+                records.combine(bests, records.session_bests(
+                    user_id, row["workout_plan"], row.get("id"), row["created_at"]
+                ))
+            try:
+                volume.record_many(user_id, [(r["created_at"], r["total_volume"]) for r in batch])
+            except Exception as e:
+                logger.error(f"Volume rollup update failed for {user_id}: {e}")
+            try:
+                exercise_index.index_sessions(user_id, inserted)
+            except Exception as e:
+                logger.error(f"Exercise index update failed for {user_id}: {e}")
+        batch.clear()
+        lines.clear()
+
+    for count, (line_no, obj) in enumerate(rows, start=1):
+        if count > max_rows:
+            summary["truncated"] = True
+            break
+
+        if isinstance(obj, Exception):
+            fail(line_no, [{"msg": str(obj)}])
+            continue
+        try:
+            data = SessionImport.model_validate(obj)
+        except ValidationError as e:
+            fail(line_no, e.errors(include_url=False, include_context=False, include_input=False))
+            continue
+
+        batch.append(to_record(user_id, data, now))
+        lines.append(line_no)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    try:
+        summary["new_records"] = records.apply(user_id, bests) if bests else []
+    except Exception as e:
+        logger.error(f"PR detection failed for {user_id}: {e}")
+        summary["new_records"] = []
+    return summary
@@ -0,0 +1,216 @@
+import heapq
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+
+import msgspec
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+#---------------------------------------------
+# Server-side sessions
+#
+# The cookie only carries a (signed) session id; the data lives in a
+# key/value store:
+#   - MemoryStore: in-process dict, no disk or network I/O. Use with a
+#     single worker process (e.g. `gunicorn --threads N`).
+#   - RedisStore: shared across workers/hosts. Takes any redis-py
+#     compatible client, so fakeredis can stand in locally.
+# Values are msgpack encoded and only written when the session changed
+# or is past half its lifetime.
+#---------------------------------------------
+
+_encoder = msgspec.msgpack.Encoder()
+_decoder = msgspec.msgpack.Decoder()
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, written_at=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        # None -> never stored (new session)
+        self.written_at = written_at
+        self.modified = False
+
+
+class MemoryStore:
+    """
+    Thread-safe in-process store. Expired entries are dropped lazily on read
+    and swept in bounded batches on write, so no request pays for a full scan.
+    """
+
+    def __init__(self, sweep_every=256, sweep_batch=512):
+        self._data = {}
+        self._expiry = []  # heap of (expires_at, sid)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.sweep_every = sweep_every
+        self.sweep_batch = sweep_batch
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._data.get(sid)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.time():
+                del self._data[sid]
+                return None
+            return value
+
+    def set(self, sid, value, ttl):
+        expires = time.time() + ttl
+        with self._lock:
+            self._data[sid] = (value, expires)
+            heapq.heappush(self._expiry, (expires, sid))
+            self._writes += 1
+            if self._writes % self.sweep_every == 0:
+                self._sweep()
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def _sweep(self):
+        now = time.time()
+        for _ in range(self.sweep_batch):
+            if not self._expiry or self._expiry[0][0] >= now:
+                return
+            expires, sid = heapq.heappop(self._expiry)
+            entry = self._data.get(sid)
+            # the session may have been rewritten with a later expiry
+            if entry is not None and entry[1] <= expires:
+                del self._data[sid]
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisStore:
+    """Networked store; expiry is handled by redis itself."""
+
+    def __init__(self, client, prefix="session:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SESSION_BACKEND='redis' requires the redis package")
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, sid):
+        return self.client.get(self.prefix + sid)
+
+    def set(self, sid, value, ttl):
+        self.client.set(self.prefix + sid, value, ex=max(1, int(ttl)))
+
+    def delete(self, sid):
+        self.client.delete(self.prefix + sid)
+
+
+class KVSessionInterface(SessionInterface):
+    serializer = None  # sessions never go through Flask's cookie serializer
+
+    def __init__(self, store, use_signer=True):
+        self.store = store
+        self.use_signer = use_signer
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt="buffbuds-session", key_derivation="hmac")
+
+    def _lifetime(self, app):
+        return app.permanent_session_lifetime.total_seconds()
+
+    def _expires(self, app):
+        # SESSION_PERMANENT -> persistent cookie, otherwise a browser-session cookie
+        if not app.config.get("SESSION_PERMANENT", True):
+            return None
+        return datetime.now(timezone.utc) + app.permanent_session_lifetime
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if not cookie:
+            return ServerSession(sid=secrets.token_urlsafe(32))
+
+        sid = cookie
+        if self.use_signer:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                return ServerSession(sid=secrets.token_urlsafe(32))
+
+        raw = self.store.get(sid)
+        if raw is None:
+            return ServerSession(sid=secrets.token_urlsafe(32))
+
+        try:
+            written_at, data = _decoder.decode(raw)
+        except msgspec.DecodeError:
+            return ServerSession(sid=secrets.token_urlsafe(32))
+
+        return ServerSession(data, sid=sid, written_at=written_at)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            # emptied (e.g. logout) -> drop it; never stored -> nothing to do
+            if session.written_at is not None:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        lifetime = self._lifetime(app)
+        now = time.time()
+
+        # lazy write: unchanged sessions are only rewritten (and their
+        # cookie re-issued) once they are past half their lifetime
+        if (
+            not session.modified
+            and session.written_at is not None
+            and now - session.written_at < lifetime / 2
+        ):
+            return
+
+        self.store.set(session.sid, _encoder.encode([now, dict(session)]), lifetime)
+
+        value = session.sid
+        if self.use_signer:
+            value = self._signer(app).sign(value).decode()
+
+        response.set_cookie(
+            name,
+            value,
+            expires=self._expires(app),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def init_session(app):
+    """Install the session interface selected by SESSION_BACKEND."""
+    backend = app.config.get("SESSION_BACKEND", "memory")
+
+    if backend == "memory":
+        store = MemoryStore()
+    elif backend == "redis":
+        store = RedisStore.from_url(app.config["SESSION_REDIS_URL"])
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+
+    app.session_interface = KVSessionInterface(
+        store, use_signer=app.config.get("SESSION_USE_SIGNER", True)
+    )
@@ -1,6 +1,141 @@
+import threading
+from contextlib import contextmanager
+
+import httpx
 from app.config import Config
-from supabase import create_client, Client
+from supabase import ClientOptions, create_client, Client
+
+#---------------------------------------------
+# Shared Supabase client over one pooled HTTP connection pool
+#
+# Every blueprint imports `supabase` from here. All its PostgREST, auth
+# and storage calls go through a single thread-safe httpx pool with
+# keep-alive, HTTP/2 (when `h2` is installed) and connect/read timeouts,
+# so gunicorn threads reuse connections instead of opening their own.
+#---------------------------------------------
 
 URL = Config.SUPABASE_URL
 KEY = Config.SUPABASE_KEY
-supabase: Client = create_client(URL, KEY)
+
+try:
+    import h2  # noqa: F401
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+_local = threading.local()
+
+
+class PooledTransport(httpx.HTTPTransport):
+    """HTTP transport that tracks pool utilisation and applies per-call timeouts."""
+
+    def __init__(self, pool_size, **kwargs):
+        super().__init__(**kwargs)
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def handle_request(self, request):
+        override = getattr(_local, "timeout", None)
+        if override is not None:
+            request.extensions["timeout"] = override.as_dict()
+
+        with self._lock:
+            self.in_flight += 1
+            self.requests += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return super().handle_request(request)
+        except httpx.TimeoutException:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        except httpx.HTTPError:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def stats(self):
+        # httpcore exposes open connections on the underlying pool
+        connections = getattr(self._pool, "connections", [])
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "http2": HTTP2,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "requests": self.requests,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "open_connections": len(connections),
+                "idle_connections": sum(1 for c in connections if c.is_idle()),
+            }
+
+
+def _build_http_client():
+    transport = PooledTransport(
+        pool_size=Config.SUPABASE_POOL_SIZE,
+        http2=HTTP2,
+        limits=httpx.Limits(
+            max_connections=Config.SUPABASE_POOL_SIZE,
+            max_keepalive_connections=Config.SUPABASE_POOL_KEEPALIVE,
+            keepalive_expiry=Config.SUPABASE_KEEPALIVE_EXPIRY,
+        ),
+    )
+    client = httpx.Client(
+        transport=transport,
+        timeout=httpx.Timeout(
+            connect=Config.SUPABASE_CONNECT_TIMEOUT,
+            read=Config.SUPABASE_READ_TIMEOUT,
+            write=Config.SUPABASE_READ_TIMEOUT,
+            # how long a thread may wait for a free connection
+            pool=Config.SUPABASE_POOL_TIMEOUT,
+        ),
+        follow_redirects=True,
+    )
+    return client, transport
+
+
+http_client, _transport = _build_http_client()
+
+supabase: Client = create_client(URL, KEY, options=ClientOptions(httpx_client=http_client))
+
+
+@contextmanager
+def call_timeout(connect=None, read=None):
+    """
+    Override connect/read timeouts for supabase calls made by this thread
+    inside the block, e.g. a slow report query or a fast-fail health check:
+
+        with call_timeout(read=2):
+            supabase.table("Posts").select("id").limit(1).execute()
+    """
+    default = http_client.timeout
+    previous = getattr(_local, "timeout", None)
+    _local.timeout = httpx.Timeout(
+        connect=default.connect if connect is None else connect,
+        read=default.read if read is None else read,
+        write=default.write if read is None else read,
+        pool=default.pool,
+    )
+    try:
+        yield
+    finally:
+        _local.timeout = previous
+
+
+def slow_calls():
+    """call_timeout for reads that legitimately run long (big scans, rebuilds)."""
+    return call_timeout(read=Config.SUPABASE_SLOW_READ_TIMEOUT)
+
+
+def pool_stats():
+    """Connection pool utilisation, for sizing workers against the gateway."""
+    return _transport.stats()
@@ -0,0 +1,159 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from app.supabase_client import supabase
+from app.pagination import apply_keyset, page
+from app.fanout import concurrently
+
+#---------------------------------------------
+# Home timeline store (fan-out on write)
+#
+# timeline(user_id, post_id, author_id, created_at) holds one row per post
+# per reader, so reading a home feed is a single range read on
+# (user_id, created_at, post_id) instead of a scan + join over Followers.
+#
+# Fan-out cost grows with the author's follower count, so new posts are
+# fanned out in the background (in_background) and the request returns
+# right after the post insert.
+#---------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+# rows per insert / per Followers page
+CHUNK_SIZE = 500
+
+# how many of a user's recent posts land in a new follower's timeline
+BACKFILL_LIMIT = 100
+
+# background fan-outs per worker; each one still writes its chunks concurrently
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="timeline")
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _insert(rows):
+    # chunks are independent, so large fan-outs are written concurrently
+    concurrently(*[
+        supabase.table("timeline").upsert(
+            chunk, on_conflict="user_id,post_id", ignore_duplicates=True
+        ).execute
+        for chunk in _chunks(rows)
+    ])
+
+
+def _follower_ids(user_id):
+    """Page through Followers so large accounts are not cut off at max-rows."""
+    start = 0
+    while True:
+        res = (
+            supabase.table("Followers")
+            .select("user_id")
+            .eq("followed_user_id", user_id)
+            .range(start, start + CHUNK_SIZE - 1)
+            .execute()
+        )
+        rows = res.data or []
+        for row in rows:
+            yield row["user_id"]
+        if len(rows) < CHUNK_SIZE:
+            return
+        start += CHUNK_SIZE
+
+
+def fan_out(post):
+    """Push a new post into the author's and every follower's timeline."""
+    author_id = post["user_id"]
+    readers = {author_id, *_follower_ids(author_id)}
+
+    _insert([
+        {
+            "user_id": reader_id,
+            "post_id": post["id"],
+            "author_id": author_id,
+            "created_at": post["created_at"],
+        }
+        for reader_id in readers
+    ])
+
+
+def retract(post_id):
+    """Remove a deleted post from every timeline it was fanned out to."""
+    supabase.table("timeline").delete().eq("post_id", post_id).execute()
+
+
+def retract_many(post_ids):
+    """retract() for a batch of deleted posts, in chunked in_() deletes."""
+    concurrently(*[
+        supabase.table("timeline").delete().in_("post_id", chunk).execute
+        for chunk in _chunks(post_ids, 200)
+    ])
+
+
+def backfill(follower_id, followed_id):
+    """Copy the followed user's recent posts into the follower's timeline."""
+    res = (
+        supabase.table("Posts")
+        .select("id, created_at")
+        .eq("user_id", followed_id)
+        .order("created_at", desc=True)
+        .limit(BACKFILL_LIMIT)
+        .execute()
+    )
+
+    _insert([
+        {
+            "user_id": follower_id,
+            "post_id": p["id"],
+            "author_id": followed_id,
+            "created_at": p["created_at"],
+        }
+        for p in res.data or []
+    ])
+
+
+def prune(follower_id, followed_id):
+    """Drop the unfollowed user's posts from the follower's timeline."""
+    (
+        supabase.table("timeline")
+        .delete()
+        .eq("user_id", follower_id)
+        .eq("author_id", followed_id)
+        .execute()
+    )
+
+
+def read(user_id, columns, limit, cursor=None):
+    """
+    Read one page of a user's home timeline, newest first.
+    Returns (posts, next_cursor). Raises InvalidCursor on a bad cursor.
+    """
+    query = (
+        supabase.table("timeline")
+        .select(f"post_id, created_at, Posts({columns})")
+        .eq("user_id", user_id)
+    )
+    query = apply_keyset(query, cursor, id_col="post_id")
+
+    res = query.limit(limit + 1).execute()
+    rows, next_cursor = page(res.data, limit, id_col="post_id")
+
+    return [row["Posts"] for row in rows if row.get("Posts")], next_cursor
+
+
+def safely(fn, *args):
+    """
+    Run a timeline write without failing the request that triggered it.
+    The source rows are already committed; a missed fan-out only delays
+    a post showing up in someone's home feed.
+    """
+    try:
+        fn(*args)
+    except Exception as e:
+        logger.error(f"Timeline {fn.__name__} failed: {e}")
+
+
+def in_background(fn, *args):
+    """Queue a timeline write (through safely) and return at once."""
+    _executor.submit(safely, fn, *args)
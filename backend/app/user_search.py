@@ -0,0 +1,136 @@
+import threading
+import time
+from bisect import bisect_left
+from app.supabase_client import slow_calls, supabase
+
+#---------------------------------------------
+# Username prefix index for autocomplete
+#
+# All usernames are held as a sorted array of lower-cased keys, so a
+# prefix lookup is one bisect plus a short forward scan - no database
+# query per keystroke. The array is built lazily on first use and kept
+# current by signup / rename / delete on this worker; it is rebuilt
+# every REBUILD_INTERVAL seconds to pick up changes made on other
+# workers. Changes made while a rebuild is loading are replayed onto
+# the new arrays before they replace the old ones.
+#---------------------------------------------
+
+REBUILD_INTERVAL = 600
+BUILD_PAGE_SIZE = 1000
+
+_lock = threading.Lock()
+_build_lock = threading.Lock()
+_keys = []    # sorted lower-cased usernames
+_names = []   # display usernames, parallel to _keys
+_built_at = None
+_pending = None  # ("add" | "remove", username) seen during a rebuild, else None
+
+
+def _load():
+    names, last_id = [], None
+    while True:
+        # keyset on the primary key; usernames never need quoting this way
+        query = supabase.table("user_profile").select("id, username").order("id")
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        with slow_calls():
+            rows = query.limit(BUILD_PAGE_SIZE).execute().data or []
+        names.extend(r["username"] for r in rows if r.get("username"))
+        if len(rows) < BUILD_PAGE_SIZE:
+            break
+        last_id = rows[-1]["id"]
+
+    pairs = sorted((n.lower(), n) for n in names)
+    return [k for k, _ in pairs], [n for _, n in pairs]
+
+
+def _fresh():
+    return _built_at is not None and time.monotonic() - _built_at < REBUILD_INTERVAL
+
+
+def _ensure_built():
+    global _keys, _names, _built_at, _pending
+    if _fresh():
+        return
+    # one thread rebuilds; once built, other readers keep using the
+    # stale arrays rather than waiting for it
+    if not _build_lock.acquire(blocking=_built_at is None):
+        return
+    try:
+        if _fresh():
+            return
+        with _lock:
+            _pending = []
+        try:
+            keys, names = _load()
+        except Exception:
+            with _lock:
+                _pending = None
+            raise
+        with _lock:
+            # the load may predate signups / renames / deletes made meanwhile
+            for op, username in _pending:
+                (_insert if op == "add" else _delete)(keys, names, username)
+            _keys, _names, _built_at, _pending = keys, names, time.monotonic(), None
+    finally:
+        _build_lock.release()
+
+
+def search(prefix, limit=10):
+    """Up to `limit` usernames starting with prefix (case-insensitive), exact match first."""
+    _ensure_built()
+    prefix = prefix.lower()
+
+    with _lock:
+        keys, names = _keys, _names
+        start = bisect_left(keys, prefix)
+        end = start
+        while end < len(keys) and end - start < limit and keys[end].startswith(prefix):
+            end += 1
+        # lexicographic order already puts an exact match first
+        return names[start:end]
+
+
+def _insert(keys, names, username):
+    key = username.lower()
+    i = bisect_left(keys, key)
+    while i < len(keys) and keys[i] == key:
+        if names[i] == username:
+            return
+        i += 1
+    keys.insert(i, key)
+    names.insert(i, username)
+
+
+def _delete(keys, names, username):
+    key = username.lower()
+    i = bisect_left(keys, key)
+    while i < len(keys) and keys[i] == key:
+        if names[i] == username:
+            del keys[i]
+            del names[i]
+            return
+        i += 1
+
+
+def _change(op, username):
+    if not username:
+        return
+    with _lock:
+        if _pending is not None:
+            _pending.append((op, username))
+        if _built_at is not None:
+            (_insert if op == "add" else _delete)(_keys, _names, username)
+
+
+def add(username):
+    _change("add", username)
+
+
+def remove(username):
+    _change("remove", username)
+
+
+def rename(old, new):
+    remove(old)
+    add(new)
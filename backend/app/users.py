@@ -0,0 +1,54 @@
+from app.cache import MISSING, TTLCache
+from app.loaders import loader
+
+#---------------------------------------------
+# Shared username -> user id resolution
+#
+# Most social endpoints start by turning a username from the url into a
+# user_profile id. Results (including "no such user") are cached so the
+# common case skips that round-trip. Anything that renames or removes an
+# account must call forget_username / forget_user_id.
+#---------------------------------------------
+
+# unknown names are cached for less time so a fresh signup shows up quickly
+MISS_TTL = 30
+
+_ids = TTLCache(maxsize=10_000, ttl=300)
+
+# reverse map so deletes that only know the id can drop the username entry
+_names = TTLCache(maxsize=10_000, ttl=300)
+
+
+def resolve_user_id(username):
+    """Return the user_profile id for a username, or None if there is none."""
+    cached = _ids.get(username)
+    if cached is not MISSING:
+        return cached
+
+    profile = loader("user_profile", key="username", columns="id").load(username)
+    user_id = profile["id"] if profile else None
+
+    if user_id is None:
+        _ids.set(username, None, ttl=MISS_TTL)
+    else:
+        _ids.set(username, user_id)
+        _names.set(user_id, username)
+
+    return user_id
+
+
+def forget_username(*usernames):
+    """Drop cached entries (hits or misses) for the given usernames."""
+    for username in usernames:
+        if username is None:
+            continue
+        user_id = _ids.pop(username)
+        if user_id is not MISSING and user_id is not None:
+            _names.pop(user_id)
+
+
+def forget_user_id(user_id):
+    """Drop the cached username entry for a user id (account removed)."""
+    username = _names.pop(user_id)
+    if username is not MISSING:
+        _ids.pop(username)
@@ -0,0 +1,88 @@
+from datetime import timedelta
+from app.supabase_client import supabase
+
+#---------------------------------------------
+# Training volume rollups
+#
+# volume_rollup keeps running totals per (user, bucket, period) for the
+# day / week / month buckets. Session writes push their volume delta in
+# with one RPC; reads are a small range scan of one bucket.
+#---------------------------------------------
+
+BUCKETS = ("day", "week", "month")
+
+# upper bound on points returned by one read (~3 years of days)
+MAX_POINTS = 1100
+
+
+def session_volume(workout_plan):
+    """Total weight x reps across every set of a validated WorkoutPlan."""
+    return float(sum(s.weight * s.reps for ex in workout_plan.exercises for s in ex.sets))
+
+
+def period_start(bucket, day):
+    """Start of the bucket containing day, as date_trunc() computes it (weeks start Monday)."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def record(user_id, at, volume, sessions=1):
+    """
+    Add `volume` (may be negative for corrections) and `sessions` to the
+    day, week and month rollups containing `at`.
+    """
+    if not volume and not sessions:
+        return
+
+    supabase.rpc("add_session_volume", {
+        "p_user_id": user_id,
+        "p_at": at,
+        "p_volume": volume,
+        "p_sessions": sessions,
+    }).execute()
+
+
+def record_many(user_id, sessions):
+    """
+    Add many (at, volume) session entries in one RPC, e.g. after a bulk
+    import. Entries are summed per UTC day first so each rollup row is
+    touched once.
+    """
+    days = {}
+    for at, vol in sessions:
+        day = str(at)[:10]
+        total, count = days.get(day, (0.0, 0))
+        days[day] = (total + (vol or 0), count + 1)
+
+    if not days:
+        return
+
+    supabase.rpc("add_session_volumes", {
+        "p_user_id": user_id,
+        "p_entries": [{"at": d, "volume": v, "sessions": n} for d, (v, n) in days.items()],
+    }).execute()
+
+
+def history(user_id, bucket="day", start=None, end=None):
+    """
+    Rollup points for one bucket between two dates (inclusive), oldest
+    first; a week / month that starts before `start` but overlaps it is
+    included. At most MAX_POINTS are returned - the most recent ones.
+    """
+    query = (
+        supabase.table("volume_rollup")
+        .select("period_start, volume, sessions")
+        .eq("user_id", user_id)
+        .eq("bucket", bucket)
+    )
+    if start:
+        query = query.gte("period_start", period_start(bucket, start).isoformat())
+    if end:
+        query = query.lte("period_start", end.isoformat())
+
+    # newest first so the cap drops old points, not recent ones
+    res = query.order("period_start", desc=True).limit(MAX_POINTS).execute()
+    return (res.data or [])[::-1]
@@ -0,0 +1,150 @@
+"""
+Encode + compress cost of our largest JSON responses.
+
+Compares Flask's stdlib-json provider with the msgspec provider from
+app/responses.py, and the bytes on the wire with gzip / brotli, on
+synthetic payloads shaped like:
+
+  - feed:     a page of posts with embedded comments
+  - admin:    the full user_profile listing
+  - sessions: a long-time user's session history with workout plans
+
+Run from backend/:  python benchmarks/bench_responses.py [--scale N]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# importing app builds the supabase client; no requests are made here
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from app.responses import MsgspecJSONProvider, brotli, compress  # noqa: E402
+
+LEVEL = {"gzip": 6, "br": 5}
+WORDS = "squat bench deadlift press row curl pull push legs day pr lift heavy light volume".split()
+
+
+def text(n):
+    return " ".join(random.choice(WORDS) for _ in range(n))
+
+
+def when(i):
+    return datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(hours=i)
+
+
+def feed(scale):
+    return {"data": [
+        {
+            "id": i,
+            "title": text(5),
+            "content": text(60),
+            "like_count": random.randint(0, 500),
+            "comment_count": 20,
+            "created_at": when(i),
+            "liked_by_me": bool(i % 3),
+            "user_profile": {"username": f"user{i % 97}"},
+            "comments": [
+                {"id": i * 100 + j, "username": f"user{j}", "text": text(15), "created_at": when(i + j)}
+                for j in range(20)
+            ],
+        }
+        for i in range(50 * scale)
+    ], "next_cursor": "WyIyMDI0LTAxLTAxIiwxXQ"}
+
+
+def admin_users(scale):
+    return [
+        {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "username": f"user{i}",
+            "user_bio": text(25),
+            "profile_picture": f"https://example.supabase.co/storage/v1/object/public/avatars/{i}.png",
+            "bench_pr": 100.0 + i % 50,
+            "squat_pr": 140.0 + i % 60,
+            "deadlift_pr": 180.0 + i % 70,
+            "admin": i % 500 == 0,
+            "created_at": when(i),
+            "updated_at": when(i + 5),
+        }
+        for i in range(5000 * scale)
+    ]
+
+
+def sessions(scale):
+    return {"data": [
+        {
+            "id": i,
+            "created_at": when(i * 24),
+            "notes": text(8),
+            "total_volume": 12_345.0,
+            "workout_plan": {
+                "name": text(2),
+                "description": None,
+                "exercises": [
+                    {
+                        "name": random.choice(WORDS).title(),
+                        "type": "strength",
+                        "sets": [{"weight": 60.0 + s * 5, "reps": 10 - s} for s in range(4)],
+                    }
+                    for _ in range(6)
+                ],
+            },
+        }
+        for i in range(1000 * scale)
+    ], "next_cursor": None}
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1, help="multiply payload sizes")
+    args = parser.parse_args()
+    random.seed(7)
+
+    app = Flask(__name__)
+    providers = {"stdlib": DefaultJSONProvider(app), "msgspec": MsgspecJSONProvider(app)}
+    payloads = {"feed": feed(args.scale), "admin": admin_users(args.scale), "sessions": sessions(args.scale)}
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+
+    print(f"{'payload':<10}{'encoder':<9}{'encode ms':>10}{'raw KB':>9}", end="")
+    for enc in encodings:
+        print(f"{enc + ' ms':>10}{enc + ' KB':>9}", end="")
+    print()
+
+    for name, payload in payloads.items():
+        for label, provider in providers.items():
+            ms, body = best_of(lambda: provider.dumps(payload).encode())
+            print(f"{name:<10}{label:<9}{ms:>10.2f}{len(body) / 1024:>9.1f}", end="")
+            for enc in encodings:
+                cms, packed = best_of(lambda: compress(body, enc, LEVEL), repeat=3)
+                print(f"{cms:>10.2f}{len(packed) / 1024:>9.1f}", end="")
+            print()
+
+    if brotli is None:
+        print("\n(brotli not installed - gzip only)")
+
+    # sanity: both encoders produce equivalent documents
+    for payload in payloads.values():
+        a = json.loads(providers["stdlib"].dumps(payload))
+        b = json.loads(providers["msgspec"].dumps(payload))
+        assert len(a) == len(b)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import os
+
+# Threaded serving: handlers spend nearly all their time waiting on supabase
+# HTTP calls, so each worker process serves many requests concurrently on
+# threads (the GIL is released during network I/O). SUPABASE_POOL_SIZE
+# defaults to GUNICORN_THREADS + FANOUT_THREADS (+ a few for background
+# workers) so requests don't queue on connections; if you set it yourself,
+# keep it at least that large.
+#
+#   gunicorn wsgi:app
+#
+# Sessions: with more than one worker use SESSION_BACKEND=redis.
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+timeout = 30
+keepalive = 5
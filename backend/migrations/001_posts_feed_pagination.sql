@@ -0,0 +1,11 @@
+-- Keyset pagination for GET /posts
+-- Run in the Supabase SQL editor.
+
+-- feed is read newest first on (created_at, id)
+create index if not exists posts_created_at_id_idx
+    on "Posts" (created_at desc, id desc);
+
+-- feed ships a comment count instead of the whole comments array
+alter table "Posts"
+    add column if not exists comment_count integer
+    generated always as (coalesce(jsonb_array_length(comments::jsonb), 0)) stored;
@@ -0,0 +1,35 @@
+-- Fan-out-on-write home timeline (GET /posts/timeline)
+-- One row per (reader, post); written by create_post / follow,
+-- removed by delete_post / unfollow.
+
+create table if not exists timeline (
+    user_id    uuid        not null references user_profile (id) on delete cascade,
+    post_id    bigint      not null references "Posts" (id) on delete cascade,
+    author_id  uuid        not null references user_profile (id) on delete cascade,
+    created_at timestamptz not null,
+    primary key (user_id, post_id)
+);
+
+-- range read for a reader's feed
+create index if not exists timeline_user_created_idx
+    on timeline (user_id, created_at desc, post_id desc);
+
+-- prune on unfollow
+create index if not exists timeline_user_author_idx
+    on timeline (user_id, author_id);
+
+-- retract on post delete
+create index if not exists timeline_post_idx
+    on timeline (post_id);
+
+-- seed existing timelines: own posts + posts of everyone followed
+insert into timeline (user_id, post_id, author_id, created_at)
+select p.user_id, p.id, p.user_id, p.created_at
+from "Posts" p
+on conflict do nothing;
+
+insert into timeline (user_id, post_id, author_id, created_at)
+select f.user_id, p.id, p.user_id, p.created_at
+from "Followers" f
+join "Posts" p on p.user_id = f.followed_user_id
+on conflict do nothing;
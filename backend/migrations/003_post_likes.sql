@@ -0,0 +1,75 @@
+-- Post likes as (post, user) edges with an atomically maintained counter.
+-- Replaces read-modify-write of Posts.liked_by / Posts.like_count.
+
+create table if not exists post_likes (
+    post_id    bigint      not null references "Posts" (id) on delete cascade,
+    user_id    uuid        not null references user_profile (id) on delete cascade,
+    created_at timestamptz not null default now(),
+    primary key (post_id, user_id)
+);
+
+-- "which of these posts did I like" lookups for feed pages
+create index if not exists post_likes_user_post_idx
+    on post_likes (user_id, post_id);
+
+-- carry over existing likes and resync the counters
+insert into post_likes (post_id, user_id)
+select p.id, u.user_id::uuid
+from "Posts" p
+cross join lateral unnest(coalesce(p.liked_by, '{}')) as u(user_id)
+on conflict do nothing;
+
+update "Posts" p
+set like_count = (select count(*) from post_likes l where l.post_id = p.id);
+
+-- Idempotent like / unlike. The counter only moves when an edge is actually
+-- added or removed, inside the same statement, so concurrent calls can't
+-- lose updates. Both return the new like_count, or null if the post is gone.
+create or replace function like_post(p_post_id bigint, p_user_id uuid)
+returns integer
+language plpgsql
+as $$
+declare
+    n integer;
+begin
+    if not exists (select 1 from "Posts" where id = p_post_id) then
+        return null;
+    end if;
+
+    insert into post_likes (post_id, user_id)
+    values (p_post_id, p_user_id)
+    on conflict do nothing;
+
+    if found then
+        update "Posts" set like_count = like_count + 1
+        where id = p_post_id
+        returning like_count into n;
+    else
+        select like_count into n from "Posts" where id = p_post_id;
+    end if;
+
+    return n;
+end;
+$$;
+
+create or replace function unlike_post(p_post_id bigint, p_user_id uuid)
+returns integer
+language plpgsql
+as $$
+declare
+    n integer;
+begin
+    delete from post_likes
+    where post_id = p_post_id and user_id = p_user_id;
+
+    if found then
+        update "Posts" set like_count = greatest(like_count - 1, 0)
+        where id = p_post_id
+        returning like_count into n;
+    else
+        select like_count into n from "Posts" where id = p_post_id;
+    end if;
+
+    return n;
+end;
+$$;
@@ -0,0 +1,54 @@
+-- Comments as individual append-only rows instead of the Posts.comments
+-- JSON blob. Posts.comment_count becomes a trigger-maintained counter.
+
+create table if not exists post_comments (
+    id         bigint generated always as identity primary key,
+    post_id    bigint      not null references "Posts" (id) on delete cascade,
+    user_id    uuid        references user_profile (id) on delete set null,
+    username   text        not null,
+    text       text        not null,
+    created_at timestamptz not null default now()
+);
+
+-- thread reads, oldest first, keyset on (created_at, id)
+create index if not exists post_comments_post_created_idx
+    on post_comments (post_id, created_at, id);
+
+-- carry over existing comments (author resolved by username where possible)
+insert into post_comments (post_id, user_id, username, text, created_at)
+select p.id,
+       u.id,
+       coalesce(c ->> 'username', 'unknown'),
+       coalesce(c ->> 'text', ''),
+       coalesce((c ->> 'created_at')::timestamptz, p.created_at)
+from "Posts" p
+cross join lateral jsonb_array_elements(coalesce(p.comments::jsonb, '[]'::jsonb)) as c
+left join user_profile u on u.username = c ->> 'username';
+
+-- replace the generated column from 001 with a maintained counter
+alter table "Posts" drop column if exists comment_count;
+alter table "Posts" add column comment_count integer not null default 0;
+
+update "Posts" p
+set comment_count = (select count(*) from post_comments c where c.post_id = p.id);
+
+create or replace function post_comments_count()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op = 'INSERT' then
+        update "Posts" set comment_count = comment_count + 1 where id = new.post_id;
+    else
+        update "Posts" set comment_count = greatest(comment_count - 1, 0) where id = old.post_id;
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists post_comments_count on post_comments;
+create trigger post_comments_count
+    after insert or delete on post_comments
+    for each row execute function post_comments_count();
+
+-- Posts.comments is no longer read or written; drop it once clients are updated.
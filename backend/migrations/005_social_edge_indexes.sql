@@ -0,0 +1,14 @@
+-- Keyset pagination for follower / following / likes lists.
+-- Lists are read newest first on (created_at, id) per user.
+
+alter table "Followers" add column if not exists created_at timestamptz not null default now();
+alter table user_likes  add column if not exists created_at timestamptz not null default now();
+
+create index if not exists followers_followed_created_idx
+    on "Followers" (followed_user_id, created_at desc, id desc);
+
+create index if not exists followers_user_created_idx
+    on "Followers" (user_id, created_at desc, id desc);
+
+create index if not exists user_likes_liked_created_idx
+    on user_likes (liked_user_id, created_at desc, id desc);
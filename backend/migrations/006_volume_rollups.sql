@@ -0,0 +1,40 @@
+-- Incrementally maintained training volume per user, rolled up by
+-- day / week / month. Replaces rebuilding user_profile.volume_history on
+-- every read; GET /user/volume-history reads one bucket for a date range.
+
+create table if not exists volume_rollup (
+    user_id      uuid    not null references user_profile (id) on delete cascade,
+    bucket       text    not null check (bucket in ('day', 'week', 'month')),
+    period_start date    not null,
+    volume       numeric not null default 0,
+    sessions     integer not null default 0,
+    primary key (user_id, bucket, period_start)
+);
+
+-- Add a session's volume (or a correction) to all three rollups at once.
+-- Upserts make concurrent writes for the same period safe.
+create or replace function add_session_volume(
+    p_user_id uuid, p_at timestamptz, p_volume numeric, p_sessions integer
+)
+returns void
+language sql
+as $$
+    insert into volume_rollup (user_id, bucket, period_start, volume, sessions)
+    select p_user_id, b.bucket, date_trunc(b.bucket, p_at at time zone 'utc')::date, p_volume, p_sessions
+    from (values ('day'), ('week'), ('month')) as b(bucket)
+    on conflict (user_id, bucket, period_start) do update
+    set volume   = volume_rollup.volume + excluded.volume,
+        sessions = volume_rollup.sessions + excluded.sessions;
+$$;
+
+-- backfill from existing sessions
+insert into volume_rollup (user_id, bucket, period_start, volume, sessions)
+select s.user_id, b.bucket,
+       date_trunc(b.bucket, s.created_at at time zone 'utc')::date,
+       sum(coalesce(s.total_volume, 0)),
+       count(*)
+from workout_session s
+cross join (values ('day'), ('week'), ('month')) as b(bucket)
+group by 1, 2, 3
+on conflict (user_id, bucket, period_start) do update
+set volume = excluded.volume, sessions = excluded.sessions;
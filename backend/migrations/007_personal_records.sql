@@ -0,0 +1,19 @@
+-- Automatically tracked personal records, one row per (user, exercise).
+-- exercise is the normalized name (lower case, single spaces).
+-- Maintained by POST /sessions; rebuild with `python -m app.records`.
+
+create table if not exists personal_records (
+    user_id       uuid        not null references user_profile (id) on delete cascade,
+    exercise      text        not null,
+    display_name  text        not null,
+    weight        numeric     not null,
+    reps          integer     not null,
+    estimated_1rm numeric     not null,
+    session_id    bigint      references workout_session (id) on delete set null,
+    achieved_at   timestamptz not null,
+    primary key (user_id, exercise)
+);
+
+-- keyset scan used by the rebuild job
+create index if not exists workout_session_user_id_idx
+    on workout_session (user_id, id);
@@ -0,0 +1,20 @@
+-- Bulk variant of add_session_volume for POST /sessions/import.
+-- p_entries is a json array of {"at": date, "volume": numeric, "sessions": int},
+-- already summed per day by the caller; one call per import batch.
+
+create or replace function add_session_volumes(p_user_id uuid, p_entries jsonb)
+returns void
+language sql
+as $$
+    insert into volume_rollup (user_id, bucket, period_start, volume, sessions)
+    select p_user_id, b.bucket,
+           date_trunc(b.bucket, (e->>'at')::date)::date,
+           sum((e->>'volume')::numeric),
+           sum((e->>'sessions')::integer)
+    from jsonb_array_elements(p_entries) as e
+    cross join (values ('day'), ('week'), ('month')) as b(bucket)
+    group by 2, 3
+    on conflict (user_id, bucket, period_start) do update
+    set volume   = volume_rollup.volume + excluded.volume,
+        sessions = volume_rollup.sessions + excluded.sessions;
+$$;
@@ -0,0 +1,5 @@
+-- GET /sessions pages a user's history newest first with keyset
+-- pagination on (created_at, id) and optional date bounds.
+
+create index if not exists workout_session_user_created_idx
+    on workout_session (user_id, created_at desc, id desc);
@@ -0,0 +1,48 @@
+-- Per-exercise history index. exercise_names interns normalized exercise
+-- names (lower case, single spaces); exercise_history has one row per
+-- (session, exercise) so GET /sessions/exercises/<name>/history is a
+-- range read instead of a scan over every workout_plan.
+
+create table if not exists exercise_names (
+    id   bigint generated always as identity primary key,
+    name text not null unique
+);
+
+create table if not exists exercise_history (
+    user_id      uuid        not null references user_profile (id) on delete cascade,
+    exercise_id  bigint      not null references exercise_names (id),
+    session_id   bigint      not null references workout_session (id) on delete cascade,
+    performed_at timestamptz not null,
+    display_name text        not null,
+    sets         jsonb       not null,
+    set_count    integer     not null,
+    volume       numeric     not null,
+    top_weight   numeric     not null,
+    primary key (session_id, exercise_id)
+);
+
+create index if not exists exercise_history_lookup_idx
+    on exercise_history (user_id, exercise_id, performed_at, session_id);
+
+-- backfill from existing sessions
+insert into exercise_names (name)
+select distinct lower(regexp_replace(btrim(e.value->>'name'), '\s+', ' ', 'g'))
+from workout_session s
+cross join jsonb_array_elements(s.workout_plan->'exercises') as e
+on conflict (name) do nothing;
+
+insert into exercise_history
+    (user_id, exercise_id, session_id, performed_at, display_name, sets, set_count, volume, top_weight)
+select s.user_id, n.id, s.id, s.created_at,
+       min(e.value->>'name'),
+       jsonb_agg(st.value order by e.ordinality, st.ordinality),
+       count(*),
+       sum((st.value->>'weight')::numeric * (st.value->>'reps')::integer),
+       max((st.value->>'weight')::numeric)
+from workout_session s
+cross join jsonb_array_elements(s.workout_plan->'exercises') with ordinality as e
+cross join jsonb_array_elements(e.value->'sets') with ordinality as st
+join exercise_names n
+  on n.name = lower(regexp_replace(btrim(e.value->>'name'), '\s+', ' ', 'g'))
+group by s.id, n.id
+on conflict (session_id, exercise_id) do nothing;
@@ -0,0 +1,52 @@
+-- Full-text search over Posts.title / Posts.content.
+-- search_vector is a stored generated column, so Postgres updates the
+-- GIN inverted index inside the same statement as every insert, edit
+-- and delete - there is no separate indexing step to fall behind.
+-- Titles weigh more than bodies when ranking.
+
+alter table "Posts"
+    add column if not exists search_vector tsvector
+    generated always as (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) stored;
+
+create index if not exists posts_search_vector_idx
+    on "Posts" using gin (search_vector);
+
+-- Ranked search for GET /posts/search. Matches come from the GIN index;
+-- pages continue after (p_after_rank, p_after_id) from the previous page.
+create or replace function search_posts(
+    p_query      text,
+    p_limit      integer,
+    p_after_rank real   default null,
+    p_after_id   bigint default null
+)
+returns table (
+    id            bigint,
+    title         text,
+    content       text,
+    like_count    integer,
+    comment_count integer,
+    created_at    timestamptz,
+    user_profile  jsonb,
+    rank          real
+)
+language sql
+stable
+as $$
+    with q as (select websearch_to_tsquery('english', p_query) as query),
+    hits as (
+        select p.*, ts_rank(p.search_vector, q.query) as rank
+        from "Posts" p, q
+        where p.search_vector @@ q.query
+    )
+    select h.id::bigint, h.title::text, h.content::text, h.like_count::integer,
+           h.comment_count::integer, h.created_at::timestamptz,
+           jsonb_build_object('username', u.username), h.rank
+    from hits h
+    left join user_profile u on u.id = h.user_id
+    where p_after_rank is null or (h.rank, h.id) < (p_after_rank, p_after_id)
+    order by h.rank desc, h.id desc
+    limit p_limit;
+$$;
@@ -0,0 +1,4 @@
+-- GET /user/users pages profiles newest first on (created_at, id).
+
+create index if not exists user_profile_created_idx
+    on user_profile (created_at desc, id desc);
@@ -0,0 +1,26 @@
+-- Admin listings page on (sort key, id) and filter with ilike '%text%'.
+
+create index if not exists posts_like_count_idx    on "Posts" (like_count, id);
+create index if not exists posts_comment_count_idx on "Posts" (comment_count, id);
+create index if not exists posts_user_created_idx  on "Posts" (user_id, created_at, id);
+
+create index if not exists workout_plans_created_idx   on workout_plans (created_at, id);
+create index if not exists workout_plans_name_idx      on workout_plans (plan_name, id);
+
+create index if not exists user_profile_username_id_idx on user_profile (username, id);
+
+-- trigram indexes make the ?q= / ?username= "contains" filters index scans
+create extension if not exists pg_trgm;
+
+create index if not exists user_profile_username_trgm_idx
+    on user_profile using gin (username gin_trgm_ops);
+create index if not exists user_profile_bio_trgm_idx
+    on user_profile using gin (user_bio gin_trgm_ops);
+create index if not exists posts_title_trgm_idx
+    on "Posts" using gin (title gin_trgm_ops);
+create index if not exists posts_content_trgm_idx
+    on "Posts" using gin (content gin_trgm_ops);
+create index if not exists workout_plans_name_trgm_idx
+    on workout_plans using gin (plan_name gin_trgm_ops);
+create index if not exists workout_plans_description_trgm_idx
+    on workout_plans using gin (description gin_trgm_ops);
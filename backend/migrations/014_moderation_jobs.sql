@@ -0,0 +1,43 @@
+-- Bulk admin moderation (POST /admin/*/bulk-delete).
+-- Account purges run in the background; each one is tracked here so any
+-- worker can report progress and per-id outcomes.
+
+create table if not exists moderation_jobs (
+    id           bigserial   primary key,
+    kind         text        not null,
+    status       text        not null default 'queued',  -- queued | running | done | failed
+    requested_by uuid,
+    results      jsonb       not null default '{}'::jsonb, -- id -> outcome
+    error        text,
+    created_at   timestamptz not null default now(),
+    finished_at  timestamptz
+);
+
+create index if not exists moderation_jobs_created_idx
+    on moderation_jobs (created_at desc, id desc);
+
+-- Remove every like a batch of users has given and take them off the
+-- liked posts' counters in the same statement, so counts stay exact.
+create or replace function purge_post_likes(p_user_ids uuid[])
+returns integer
+language sql
+as $$
+    with removed as (
+        delete from post_likes
+        where user_id = any (p_user_ids)
+        returning post_id
+    ), counts as (
+        select post_id, count(*) as n from removed group by post_id
+    ), updated as (
+        update "Posts" p
+        set like_count = greatest(p.like_count - c.n, 0)
+        from counts c
+        where p.id = c.post_id
+        returning 1
+    )
+    select count(*)::integer from updated;
+$$;
+
+-- cascade deletes filter these tables by author / owner
+create index if not exists workout_plans_user_idx on workout_plans (user_id);
+create index if not exists user_likes_liked_user_idx on user_likes (liked_user_id);
@@ -0,0 +1,40 @@
+-- Merge candidate personal records without ever lowering a stored one.
+-- Workers compare new sessions against a per-process cache that can be
+-- stale, and an import can race a POST /sessions for the same user, so
+-- the "is it better" decision is made here, under the row lock of the
+-- upsert. p_records is a json array of personal_records rows; returns
+-- only the rows that were inserted or actually improved.
+
+create or replace function merge_personal_records(p_records jsonb)
+returns setof personal_records
+language sql
+as $$
+    insert into personal_records as pr
+        (user_id, exercise, display_name, weight, reps, estimated_1rm, session_id, achieved_at)
+    select r.user_id, r.exercise, r.display_name, r.weight, r.reps,
+           r.estimated_1rm, r.session_id, r.achieved_at
+    from jsonb_to_recordset(p_records) as r(
+        user_id uuid, exercise text, display_name text, weight numeric, reps integer,
+        estimated_1rm numeric, session_id bigint, achieved_at timestamptz
+    )
+    on conflict (user_id, exercise) do update set
+        -- the heaviest set moves as a whole: weight, reps and where it was done
+        display_name  = case when (excluded.weight, excluded.reps) > (pr.weight, pr.reps)
+                             then excluded.display_name else pr.display_name end,
+        weight        = case when (excluded.weight, excluded.reps) > (pr.weight, pr.reps)
+                             then excluded.weight else pr.weight end,
+        reps          = case when (excluded.weight, excluded.reps) > (pr.weight, pr.reps)
+                             then excluded.reps else pr.reps end,
+        session_id    = case when (excluded.weight, excluded.reps) > (pr.weight, pr.reps)
+                             then excluded.session_id else pr.session_id end,
+        achieved_at   = case when (excluded.weight, excluded.reps) > (pr.weight, pr.reps)
+                             then excluded.achieved_at else pr.achieved_at end,
+        estimated_1rm = greatest(pr.estimated_1rm, excluded.estimated_1rm)
+    where (excluded.weight, excluded.reps) > (pr.weight, pr.reps)
+       or excluded.estimated_1rm > pr.estimated_1rm
+    returning pr.*;
+$$;
+
+-- "does this session hold a record" checks on session edit / delete
+create index if not exists personal_records_session_idx
+    on personal_records (session_id);
@@ -0,0 +1,10 @@
+-- Background purges refresh heartbeat_at as they work. A queued / running
+-- job whose heartbeat is old was lost with its worker (restart, recycle)
+-- and is claimed and resumed by another one (see app/moderation.py).
+
+alter table moderation_jobs
+    add column if not exists heartbeat_at timestamptz not null default now();
+
+create index if not exists moderation_jobs_active_idx
+    on moderation_jobs (heartbeat_at)
+    where status in ('queued', 'running');
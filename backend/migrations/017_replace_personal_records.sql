@@ -0,0 +1,27 @@
+-- Swap in a user's recomputed personal records atomically (the function
+-- runs in one transaction), so a failure half way through a rebuild
+-- can't leave them with none and readers never see the gap between the
+-- delete and the insert. p_records is a json array of personal_records
+-- rows for p_user_id; returns the number of rows written.
+
+create or replace function replace_personal_records(p_user_id uuid, p_records jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+    written integer;
+begin
+    delete from personal_records where user_id = p_user_id;
+
+    insert into personal_records
+        (user_id, exercise, display_name, weight, reps, estimated_1rm, session_id, achieved_at)
+    select p_user_id, r.exercise, r.display_name, r.weight, r.reps,
+           r.estimated_1rm, r.session_id, r.achieved_at
+    from jsonb_to_recordset(p_records) as r(
+        exercise text, display_name text, weight numeric, reps integer,
+        estimated_1rm numeric, session_id bigint, achieved_at timestamptz
+    );
+    get diagnostics written = row_count;
+    return written;
+end;
+$$;
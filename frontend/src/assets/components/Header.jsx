@@ -1,6 +1,6 @@
 import { useState, useEffect, useRef } from "react";
 import { Link, useNavigate } from "react-router-dom";
-import { logout, getUsers } from "../services/api";
+import { logout, searchUsers } from "../services/api";
 
 const Header = ({ username, isAdmin, setIsAuthed, setUsername }) => {
   const [menuOpen, setMenuOpen] = useState(false);
@@ -42,21 +42,12 @@ const Header = ({ username, isAdmin, setIsAuthed, setUsername }) => {
     const t = setTimeout(async () => {
       setLoading(true);
       try {
-        const res = await getUsers();
-        const arr = Array.isArray(res.data)
-          ? res.data
-          : Array.isArray(res.data?.users)
-          ? res.data.users
-          : [];
-
-        const matches = arr
-          .filter(u => typeof u?.username === "string")
-          .filter(u => u.username.toLowerCase().includes(q.toLowerCase()))
-          .slice(0, 8);
+        const res = await searchUsers(q, { limit: 8 });
+        const matches = res.data?.users || [];
 
         setSuggestions(matches);
       } catch (err) {
-        console.error("getUsers failed:", err);
+        console.error("searchUsers failed:", err);
         setSuggestions([]);
       } finally {
         setLoading(false);
@@ -1,23 +1,36 @@
 import { useState, useEffect } from "react";
 import { Heart, MessageCircle, Trash2 } from "lucide-react";
-import { likePost, unlikePost, commentOnPost, deleteComment } from "../services/api";
+import { likePost, unlikePost, commentOnPost, deleteComment, getComments } from "../services/api";
 
 const Post = ({ post, currentUserId, currentUsername }) => {
   const [liked, setLiked] = useState(false);
   const [likeCount, setLikeCount] = useState(post.like_count ?? 0);
 
-  const [comments, setComments] = useState(post.comments ?? []);
+  // feed only ships comment_count, the thread is fetched when first opened
+  const [comments, setComments] = useState(post.comments ?? null);
+  const [commentCount, setCommentCount] = useState(post.comment_count ?? post.comments?.length ?? 0);
   const [showComments, setShowComments] = useState(false);
   const [commentText, setCommentText] = useState("");
 
   useEffect(() => {
-    if (Array.isArray(post.liked_by) && currentUserId) {
+    if (typeof post.liked_by_me === "boolean") {
+      setLiked(post.liked_by_me);
+    } else if (Array.isArray(post.liked_by) && currentUserId) {
       setLiked(post.liked_by.includes(currentUserId));
     }
-  }, [post.liked_by, currentUserId]);
+  }, [post.liked_by_me, post.liked_by, currentUserId]);
 
-  const toggleComments = () => {
+  const toggleComments = async () => {
     setShowComments((prev) => !prev);
+    if (comments === null) {
+      try {
+        const res = await getComments(post.id);
+        setComments(Array.isArray(res.data) ? res.data : res.data?.data || []);
+      } catch (err) {
+        console.error("Error fetching comments:", err);
+        setComments([]);
+      }
+    }
   };
 
   const handleAddComment = async (e) => {
@@ -30,22 +43,22 @@ const Post = ({ post, currentUserId, currentUsername }) => {
         text: commentText.trim()
       };
 
-      setComments(prev => [...prev, newComment]);
       setCommentText("");
 
-      await commentOnPost(post.id, newComment);
+      const res = await commentOnPost(post.id, newComment);
+      setComments(prev => [...(prev ?? []), res.data?.comment ?? newComment]);
+      setCommentCount(prev => prev + 1);
     } catch (err) {
       console.error("Error adding comment:", err);
     }
   };
 
-  const handleDeleteComment = async (index) => {
+  const handleDeleteComment = async (commentId) => {
     try {
-      const comment = comments[index];
-
-      setComments(prev => prev.filter((_, i) => i !== index));
+      setComments(prev => prev.filter((c) => c.id !== commentId));
+      setCommentCount(prev => (prev > 0 ? prev - 1 : 0));
 
-      await deleteComment(post.id, index);
+      await deleteComment(post.id, commentId);
     } catch (err) {
       console.error("Error deleting comment:", err);
     }
@@ -209,7 +222,7 @@ const Post = ({ post, currentUserId, currentUsername }) => {
 
             <button onClick={toggleComments} className="flex items-center gap-2">
               <MessageCircle className="w-5 h-5 text-blue-500" />
-              <span>{comments.length}</span>
+              <span>{commentCount}</span>
             </button>
           </div>
         </div>
@@ -230,14 +243,14 @@ const Post = ({ post, currentUserId, currentUsername }) => {
             </form>
 
             <ul className="space-y-1">
-              {comments.map((c, i) => (
-                <li key={i} className="flex justify-between items-center">
+              {(comments ?? []).map((c, i) => (
+                <li key={c.id ?? i} className="flex justify-between items-center">
                   <span>
                     <b>{c.username}:</b> {c.text}
                   </span>
-                  {c.username === currentUsername && (
+                  {c.username === currentUsername && c.id && (
                     <button
-                      onClick={() => handleDeleteComment(i)}
+                      onClick={() => handleDeleteComment(c.id)}
                       className="text-red-500 text-xs ml-2"
                     >
                       <Trash2 className="w-4 h-4" />
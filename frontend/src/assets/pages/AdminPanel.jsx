@@ -16,6 +16,9 @@ const AdminPanel = ({ username, isAdmin, setIsAuthed, setUsername }) => {
   const [posts, setPosts] = useState([]);
   const [workoutPlans, setWorkoutPlans] = useState([]);
   const [loading, setLoading] = useState(false);
+  // listings are paginated server side: next page cursor + total per tab
+  const [nextCursor, setNextCursor] = useState(null);
+  const [total, setTotal] = useState(0);
   const [error, setError] = useState(null);
 
   useEffect(() => {
@@ -23,25 +26,27 @@ const AdminPanel = ({ username, isAdmin, setIsAuthed, setUsername }) => {
     fetchData();
   }, [activeTab]);
 
-  const fetchData = async () => {
+  const fetchData = async (cursor = null) => {
     setLoading(true);
     setError(null);
     try {
       console.log("Fetching data for tab:", activeTab);
+      const params = cursor ? { cursor } : {};
+      const append = (setter, rows) => setter((prev) => (cursor ? [...prev, ...rows] : rows));
+      let res;
       
       if (activeTab === "users") {
-        const res = await adminGetAllUsers();
-        console.log("Users response:", res.data);
-        setUsers(res.data || []);
+        res = await adminGetAllUsers(params);
+        append(setUsers, res.data?.data || []);
       } else if (activeTab === "posts") {
-        const res = await adminGetAllPosts();
-        console.log("Posts response:", res.data);
-        setPosts(res.data || []);
+        res = await adminGetAllPosts(params);
+        append(setPosts, res.data?.data || []);
       } else if (activeTab === "plans") {
-        const res = await adminGetAllWorkoutPlans();
-        console.log("Workout plans response:", res.data);
-        setWorkoutPlans(res.data || []);
+        res = await adminGetAllWorkoutPlans(params);
+        append(setWorkoutPlans, res.data?.data || []);
       }
+      setNextCursor(res?.data?.next_cursor || null);
+      setTotal(res?.data?.total || 0);
     } catch (err) {
       console.error("Error fetching data:", err);
       console.error("Error details:", err.response?.data);
@@ -117,6 +122,7 @@ const AdminPanel = ({ username, isAdmin, setIsAuthed, setUsername }) => {
           <p><strong>Users Count:</strong> {users.length}</p>
           <p><strong>Posts Count:</strong> {posts.length}</p>
           <p><strong>Plans Count:</strong> {workoutPlans.length}</p>
+          <p><strong>Total ({activeTab}):</strong> {total}</p>
         </div>
 
         {/* Tabs */}
@@ -294,6 +300,17 @@ const AdminPanel = ({ username, isAdmin, setIsAuthed, setUsername }) => {
                 )}
               </div>
             )}
+
+            {nextCursor && (
+              <div className="text-center mt-4">
+                <button
+                  onClick={() => fetchData(nextCursor)}
+                  className="px-4 py-2 bg-blue-500 text-white rounded hover:bg-blue-600 transition"
+                >
+                  Load more
+                </button>
+              </div>
+            )}
           </>
         )}
       </div>
@@ -26,6 +26,21 @@ ChartJS.register(
   Filler
 );
 
+// server-side bucket (and range) behind each chart view
+const VIEW_QUERIES = {
+  weekly: () => ({ bucket: "week" }),
+  monthly: () => ({ bucket: "month" }),
+  ytd: () => ({ bucket: "month", from: `${new Date().getFullYear()}-01-01` }),
+  all: () => ({ bucket: "month" }),
+};
+
+// points carry the bucket's first day as YYYY-MM-DD
+const labelFor = (range, day) => {
+  if (range === "weekly") return day;
+  if (range === "ytd") return String(Number(day.slice(5, 7)));
+  return day.slice(0, 7);
+};
+
 const Analytics = ({ username, isAdmin, setIsAuthed, setUsername }) => {
   const [sessions, setSessions] = useState([]);
   const [chartData, setChartData] = useState(null);
@@ -44,15 +59,20 @@ const Analytics = ({ username, isAdmin, setIsAuthed, setUsername }) => {
   }, []);
 
   useEffect(() => {
-    if (sessions.length > 0) {
-      setChartData(getChartData(view, sessions));
-    }
-  }, [sessions, view]);
+    const fetchChart = async () => {
+      try {
+        const res = await getVolumeHistory(VIEW_QUERIES[view]());
+        setChartData(getChartData(view, res.data));
+      } catch (err) {
+        console.error("Error fetching volume history:", err);
+      }
+    };
+    fetchChart();
+  }, [view]);
 
-  const getChartData = (range, sessions) => {
-    const grouped = groupSessionsByRange(sessions, range);
-    const labels = Object.keys(grouped);
-    const values = Object.values(grouped);
+  const getChartData = (range, points) => {
+    const labels = points.map((p) => labelFor(range, p.date));
+    const values = points.map((p) => p.volume || 0);
 
     return {
       labels,
@@ -70,47 +90,12 @@ const Analytics = ({ username, isAdmin, setIsAuthed, setUsername }) => {
     };
   };
 
-  const groupSessionsByRange = (sessions, range) => {
-    const grouped = {};
-    const now = new Date();
-
-    for (const s of sessions) {
-      const date = new Date(s.date);
-      const vol = s.volume || 0;
-
-      let key;
-
-      if (range === "weekly") {
-        const weekStart = new Date(date);
-        weekStart.setDate(date.getDate() - date.getDay());
-        key = weekStart.toISOString().slice(0, 10);
-      } 
-      
-      else if (range === "monthly") {
-        key = `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, "0")}`;
-      } 
-      
-      else if (range === "ytd") {
-        if (date.getFullYear() !== now.getFullYear()) continue;
-        key = `${date.getMonth() + 1}`;
-      } 
-      
-      else {
-        // ALL
-        key = `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, "0")}`;
-      }
-
-      grouped[key] = (grouped[key] || 0) + vol;
-    }
-
-    return Object.fromEntries(Object.entries(grouped).sort());
-  };
-
   // Calculate stats
-  const totalSessions = sessions.length;
-  const totalVolume = sessions.reduce((sum, s) => sum + (s.volume || 0), 0);
+  // each point is a daily rollup: { date, volume, sessions }
+  const totalSessions = sessions.reduce((sum, p) => sum + (p.sessions || 0), 0);
+  const totalVolume = sessions.reduce((sum, p) => sum + (p.volume || 0), 0);
   const avgVolume = totalSessions > 0 ? Math.round(totalVolume / totalSessions) : 0;
-  const maxVolume = sessions.length > 0 ? Math.max(...sessions.map(s => s.volume || 0)) : 0;
+  const maxVolume = sessions.length > 0 ? Math.max(...sessions.map(p => p.volume || 0)) : 0;
 
   return (
     <div className="min-h-screen bg-gradient-to-br from-gray-50 to-blue-50">
@@ -145,7 +130,7 @@ const Analytics = ({ username, isAdmin, setIsAuthed, setUsername }) => {
             <p className="text-2xl font-bold text-gray-800">{avgVolume.toLocaleString()} lbs</p>
           </div>
           <div className="bg-white rounded-xl shadow-md p-4 border-l-4 border-orange-500">
-            <p className="text-sm text-gray-600 mb-1">Max Volume</p>
+            <p className="text-sm text-gray-600 mb-1">Max Daily Volume</p>
             <p className="text-2xl font-bold text-gray-800">{maxVolume.toLocaleString()} lbs</p>
           </div>
         </div>
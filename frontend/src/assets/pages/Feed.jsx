@@ -11,32 +11,32 @@ const Feed = ({ userId, username, isAdmin, setIsAuthed, setUsername }) => {
   const [posts, setPosts] = useState([]);
   const [loading, setLoading] = useState(true);
   const [isModalOpen, setIsModalOpen] = useState(false);
+  // keyset pagination: the server returns next_cursor while older posts remain
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchPosts();
   }, []);
 
-  const fetchPosts = async () => {
+  // no cursor -> reload the newest page; with a cursor -> append the next one
+  const fetchPosts = async (cursor = null) => {
     try {
-      setLoading(true);
-      const response = await getPosts();
+      cursor ? setLoadingMore(true) : setLoading(true);
+      const response = await getPosts(cursor ? { cursor } : undefined);
       // Handle different response structures
       const postsData = Array.isArray(response.data) 
         ? response.data 
         : response.data?.data || [];
-      
-      // Sort posts by created_at date - most recent first
-      const sortedPosts = postsData.sort((a, b) => {
-        const dateA = new Date(a.created_at);
-        const dateB = new Date(b.created_at);
-        return dateB - dateA; // Descending order (newest first)
-      });
-      
-      setPosts(sortedPosts);
+
+      // pages arrive newest first, so appending keeps the feed in order
+      setPosts((prev) => (cursor ? [...prev, ...postsData] : postsData));
+      setNextCursor(response.data?.next_cursor || null);
     } catch (error) {
       console.error("Error fetching posts:", error);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -98,9 +98,21 @@ const Feed = ({ userId, username, isAdmin, setIsAuthed, setUsername }) => {
                 currentUserId={userId}
                 currentUsername={username}
                 isAdmin={isAdmin}
-                onUpdate={fetchPosts}
+                onUpdate={() => fetchPosts()}
               />
             ))}
+
+            {nextCursor && (
+              <div className="text-center pt-2">
+                <button
+                  onClick={() => fetchPosts(nextCursor)}
+                  disabled={loadingMore}
+                  className="px-6 py-2 bg-white text-blue-600 font-semibold rounded-lg shadow-md hover:bg-blue-50 disabled:opacity-50 transition touch-manipulation"
+                >
+                  {loadingMore ? "Loading..." : "Load more"}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
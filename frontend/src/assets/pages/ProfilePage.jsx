@@ -8,11 +8,12 @@ import {
   getUserPosts, 
   getUserPRs, 
   updateUser, 
-  getWorkoutSessions,
+  getVolumeHistory,
   getFollowers, 
   getFollowing,
   followUser,
-  unfollowUser
+  unfollowUser,
+  getSocialCounts
 } from "../services/api";
 import { Edit2, Camera, Save, X, TrendingUp, Dumbbell, Award, UserPlus, UserMinus, Upload, PlusCircle } from "lucide-react";
 
@@ -46,6 +47,8 @@ const ProfilePage = ({ userId, isAdmin, setIsAuthed, setUsername }) => {
   const [following, setFollowing] = useState([]);
   const [showModal, setShowModal] = useState({ type: null, visible: false });
   const [isFollowing, setIsFollowing] = useState(false);
+  // lists are paginated; header totals come from the counts endpoint
+  const [counts, setCounts] = useState({ followers: 0, following: 0 });
   const [isModalOpen, setIsModalOpen] = useState(false);
 
   // Check if current user is viewing their own profile
@@ -90,18 +93,17 @@ const ProfilePage = ({ userId, isAdmin, setIsAuthed, setUsername }) => {
 
     const fetchFollowersAndFollowing = async () => {
       try {
-        const [fRes, flRes] = await Promise.all([
+        const [fRes, flRes, cRes] = await Promise.all([
           getFollowers(username), 
-          getFollowing(username)
+          getFollowing(username),
+          getSocialCounts(username)
         ]);
         setFollowers(fRes.data.followers || []);
         setFollowing(flRes.data.following || []);
-        
-        // Check if current user is following this profile
-        if (currentUsername && !isOwnProfile) {
-          const currentUserFollowing = await getFollowing(currentUsername);
-          setIsFollowing(currentUserFollowing.data.following?.includes(username) || false);
-        }
+        setCounts({ followers: cRes.data.followers, following: cRes.data.following });
+
+        // the counts endpoint also says whether the viewer follows this profile
+        setIsFollowing(Boolean(cRes.data.is_following));
       } catch (error) {
         console.error("Error fetching followers/following:", error);
       }
@@ -115,19 +117,17 @@ const ProfilePage = ({ userId, isAdmin, setIsAuthed, setUsername }) => {
         
         // Only fetch workout sessions if viewing own profile (requires auth)
         if (isOwnProfile) {
-          const res = await getWorkoutSessions();
-          const sessions = res.data || [];
+          // monthly rollups instead of downloading every session
+          const res = await getVolumeHistory({ bucket: "month" });
+          const months = res.data || [];
           
           // Calculate total volume
-          const totalVol = sessions.reduce((sum, session) => sum + (session.total_volume || 0), 0);
+          const totalVol = months.reduce((sum, month) => sum + (Number(month.volume) || 0), 0);
           
           // Calculate workouts this month
           const now = new Date();
-          const firstDayOfMonth = new Date(now.getFullYear(), now.getMonth(), 1);
-          const workoutsThisMonth = sessions.filter(session => {
-            const sessionDate = new Date(session.created_at);
-            return sessionDate >= firstDayOfMonth;
-          }).length;
+          const thisMonth = `${now.getFullYear()}-${String(now.getMonth() + 1).padStart(2, "0")}-01`;
+          const workoutsThisMonth = months.find(month => month.date === thisMonth)?.sessions || 0;
           
           setStats({
             totalVolume: Math.round(totalVol),
@@ -240,6 +240,7 @@ const ProfilePage = ({ userId, isAdmin, setIsAuthed, setUsername }) => {
       await followUser(username);
       setIsFollowing(true);
       setFollowers([...followers, currentUsername]);
+      setCounts({ ...counts, followers: counts.followers + 1 });
     } catch (error) {
       console.error("Error following user:", error);
       alert("Failed to follow user");
@@ -251,6 +252,7 @@ const ProfilePage = ({ userId, isAdmin, setIsAuthed, setUsername }) => {
       await unfollowUser(username);
       setIsFollowing(false);
       setFollowers(followers.filter(f => f !== currentUsername));
+      setCounts({ ...counts, followers: Math.max(0, counts.followers - 1) });
     } catch (error) {
       console.error("Error unfollowing user:", error);
       alert("Failed to unfollow user");
@@ -373,14 +375,14 @@ const ProfilePage = ({ userId, isAdmin, setIsAuthed, setUsername }) => {
                   className="text-center cursor-pointer hover:opacity-75 active:opacity-50 transition touch-manipulation"
                   onClick={() => setShowModal({ type: "followers", visible: true })}
                 >
-                  <p className="text-xl sm:text-2xl font-bold text-gray-800">{followers.length}</p>
+                  <p className="text-xl sm:text-2xl font-bold text-gray-800">{counts.followers}</p>
                   <p className="text-xs sm:text-sm text-gray-600">Followers</p>
                 </div>
                 <div 
                   className="text-center cursor-pointer hover:opacity-75 active:opacity-50 transition touch-manipulation"
                   onClick={() => setShowModal({ type: "following", visible: true })}
                 >
-                  <p className="text-xl sm:text-2xl font-bold text-gray-800">{following.length}</p>
+                  <p className="text-xl sm:text-2xl font-bold text-gray-800">{counts.following}</p>
                   <p className="text-xs sm:text-sm text-gray-600">Following</p>
                 </div>
               </div>
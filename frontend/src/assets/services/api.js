@@ -18,18 +18,22 @@ export const resetPassword = (email) => API.post("/auth/reset-password-request",
 
 /* POSTS */
 export const createPost = (data) => API.post("/posts", data);
-export const getPosts = () => API.get("/posts");
+export const getPosts = (params) => API.get("/posts", { params });
+export const getTimeline = (params) => API.get("/posts/timeline", { params });
+export const searchPosts = (q, params) => API.get("/posts/search", { params: { q, ...params } });
 export const getPost = (id) => API.get(`/posts/${id}`);
 export const likePost = (id) => API.post(`/posts/${id}/like`);
 export const unlikePost = (id) => API.put(`/posts/${id}/unlike`);
+export const getComments = (id) => API.get(`/posts/${id}/comments`);
 export const commentOnPost = (id, data) => API.post(`/posts/${id}/comment`, data, {headers: {"Content-Type": "application/json"}});
-export const deleteComment = (postId, commentIndex) => API.delete(`/posts/${postId}/comment/${commentIndex}`);
+export const deleteComment = (postId, commentId) => API.delete(`/posts/${postId}/comments/${commentId}`);
 export const updatePost = (id, data) => API.put(`/posts/${id}`, data);
 export const deletePost = (id) => API.delete(`/posts/${id}`);
 export const getUserPosts = (username) => API.get(`/posts/user/${username}`);
 
 /* USERS */
-export const getUsers = () => API.get("/user/users");
+export const getUsers = (params) => API.get("/user/users", { params });
+export const searchUsers = (q, params) => API.get("/user/search", { params: { q, ...params } });
 export const getUser = (username) => API.get(`/user/users/${username}`);
 export const getUserPRs = (username) => API.get(`/user/users/${username}/prs`);
 export const updateUser = (username, data) => API.put(`/user/users/${username}`, data);
@@ -44,21 +48,32 @@ export const deleteWorkoutPlan = (id) => API.delete(`/plans/${id}`);
 
 /* WORKOUT SESSIONS */
 export const createWorkoutSession = (data) => API.post("/sessions", data);
-export const getWorkoutSessions = () => API.get("/sessions");
+export const getWorkoutSessions = (params) => API.get("/sessions", { params });
+export const getWorkoutSession = (id) => API.get(`/sessions/${id}`);
 export const updateWorkoutSession = (id, data) => API.put(`/sessions/${id}`, data);
+export const deleteWorkoutSession = (id) => API.delete(`/sessions/${id}`);
+export const getExerciseHistory = (name, params) => API.get(`/sessions/exercises/${encodeURIComponent(name)}/history`, { params });
+export const importWorkoutSessions = (file) => API.post("/sessions/import", file, { headers: { "Content-Type": file.name?.endsWith(".csv") ? "text/csv" : "application/x-ndjson" } });
+export const exportWorkoutSessions = (params) => API.get("/sessions/export", { params, responseType: "blob" });
 
 /* ANALYTICS */
-export const getVolumeHistory = () => API.get("/user/volume-history");
+export const getVolumeHistory = (params) => API.get("/user/volume-history", { params });
 
 /* FOLLOW SYSTEM */
 export const followUser = (username) => API.post(`/user/follow/${username}`);
 export const unfollowUser = (username) => API.post(`/user/unfollow/${username}`);
 export const getFollowers = (username) => API.get(`/user/${username}/followers`);
 export const getFollowing = (username) => API.get(`/user/${username}/following`);
+export const getSocialCounts = (username) => API.get(`/user/${username}/counts`);
 /* ADMIN */
-export const adminGetAllUsers = () => API.get("/admin/users");
+export const adminGetAllUsers = (params) => API.get("/admin/users", { params });
 export const adminDeleteUser = (userId) => API.delete(`/admin/users/${userId}`);
-export const adminGetAllPosts = () => API.get("/admin/posts");
+export const adminGetAllPosts = (params) => API.get("/admin/posts", { params });
 export const adminDeletePost = (postId) => API.delete(`/admin/posts/${postId}`);
-export const adminGetAllWorkoutPlans = () => API.get("/admin/workout-plans");
+export const adminGetAllWorkoutPlans = (params) => API.get("/admin/workout-plans", { params });
 export const adminDeleteWorkoutPlan = (planId) => API.delete(`/admin/workout-plans/${planId}`);
+// bulk deletes take { ids: [...] } or { filter: { username, from, to, q } }
+export const adminBulkDeleteUsers = (body) => API.post("/admin/users/bulk-delete", body);
+export const adminBulkDeletePosts = (body) => API.post("/admin/posts/bulk-delete", body);
+export const adminBulkDeleteWorkoutPlans = (body) => API.post("/admin/workout-plans/bulk-delete", body);
+export const adminGetJob = (jobId) => API.get(`/admin/jobs/${jobId}`);